@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 import json
 import logging
@@ -8,6 +9,12 @@ from transaction_details_dialog import TransactionDetailsDialog
 from decimal import Decimal
 import urllib.parse
 
+# orjson parses large responses (like verbosity 2 blocks) much faster than the stdlib json module, but optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging with timestamp and level
 logging.basicConfig(
     level=logging.DEBUG,
@@ -16,7 +23,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections kept open to Bitcoin Core (enough for the scanner's prefetch threads)
+RPC_POOL_SIZE = 16
+
 class BTCService:
+    # RPC methods that must be routed to the wallet endpoint
+    WALLET_METHODS = ["importaddress", "importmulti", "listunspent", "getaddressinfo", "listreceivedbyaddress", "getwalletinfo", "gettransaction"]
+
     def __init__(self, test_connection=True):
         load_dotenv()
         self.host = os.getenv('BTC_RPC_HOST', 'localhost')
@@ -41,6 +54,12 @@ class BTCService:
         self.progress_callback = None
         self.is_available = False
         
+        # Reuse one keep-alive session for every RPC call - auth and headers are set once here
+        self.session = requests.Session()
+        self.session.auth = (self.user, self.password)
+        self.session.headers['content-type'] = 'application/json'
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE))
+        
         # Test connection if requested
         if test_connection:
             try:
@@ -112,18 +131,25 @@ class BTCService:
             self.is_available = False
             return False
 
-    def _call_rpc(self, method, params=None, timeout=30):
-        """Make RPC call to Bitcoin Core"""
+    def _post(self, url, payload, timeout):
+        """POST a JSON-RPC payload - encoded with orjson when available (the session sets the content type)"""
+        if orjson is not None:
+            return self.session.post(url, data=orjson.dumps(payload), timeout=timeout)
+        return self.session.post(url, json=payload, timeout=timeout)
+
+    def _call_rpc(self, method, params=None, timeout=30, parse_float=None):
+        """
+        Make RPC call to Bitcoin Core
+        Pass parse_float=Decimal to get BTC amounts back as exact Decimals instead of floats
+        """
         url = f"http://{self.host}:{self.port}"
         
         # Add wallet name to URL for wallet-specific calls
-        wallet_methods = ["importaddress", "importmulti", "listunspent", "getaddressinfo", "listreceivedbyaddress", "getwalletinfo"]
-        if method in wallet_methods:
+        if method in self.WALLET_METHODS:
             # URL encode the wallet path to handle backslashes and special characters
             encoded_wallet_path = urllib.parse.quote(self.wallet_path)
             url = f"{url}/wallet/{encoded_wallet_path}"
         
-        headers = {'content-type': 'application/json'}
         payload = {
             "jsonrpc": "1.0",
             "id": "crypto-basis",
@@ -131,19 +157,21 @@ class BTCService:
             "params": params or []
         }
         
-        auth = (self.user, self.password)
-        
         logger.debug(f"Making RPC call: {method}")
         logger.debug(f"Params: {params}")
         
-        response = requests.post(url, json=payload, headers=headers, auth=auth, timeout=timeout)
+        response = self._post(url, payload, timeout)
         
         if response.status_code != 200:
             logger.error(f"RPC call failed with status {response.status_code}")
             logger.error(f"Response text: {response.text}")
             raise Exception(f"RPC call failed: {response.text}")
         
-        result = response.json()
+        # orjson has no parse_float hook - only use it when floats are fine
+        if orjson is not None and parse_float is None:
+            result = orjson.loads(response.content)
+        else:
+            result = response.json(parse_float=parse_float)
         
         if result.get('error'):
             logger.error(f"Error in RPC call: {result['error']}")
@@ -151,6 +179,53 @@ class BTCService:
         
         return result.get('result')
 
+    def _call_rpc_batch(self, calls, timeout=30):
+        """
+        Make a batched JSON-RPC call to Bitcoin Core
+        calls is a list of (method, params) tuples. Results are returned in the same
+        order as calls, with None for any call that returned an error.
+        """
+        if not calls:
+            return []
+        
+        url = f"http://{self.host}:{self.port}"
+        
+        # A batch goes to a single endpoint - use the wallet one if any call needs it
+        if any(method in self.WALLET_METHODS for method, _ in calls):
+            encoded_wallet_path = urllib.parse.quote(self.wallet_path)
+            url = f"{url}/wallet/{encoded_wallet_path}"
+        
+        payload = [
+            {
+                "jsonrpc": "1.0",
+                "id": i,
+                "method": method,
+                "params": params or []
+            }
+            for i, (method, params) in enumerate(calls)
+        ]
+        
+        logger.debug(f"Making batched RPC call: {len(calls)} requests")
+        
+        response = self._post(url, payload, timeout)
+        
+        if response.status_code != 200:
+            logger.error(f"Batched RPC call failed with status {response.status_code}")
+            logger.error(f"Response text: {response.text}")
+            raise Exception(f"Batched RPC call failed: {response.text}")
+        
+        # Responses may come back in any order - match them up by id
+        results = [None] * len(calls)
+        items = orjson.loads(response.content) if orjson is not None else response.json()
+        for item in items:
+            if item.get('error'):
+                method = calls[item['id']][0]
+                logger.debug(f"Error in batched RPC call {method}: {item['error']}")
+                continue
+            results[item['id']] = item.get('result')
+        
+        return results
+
     def get_transaction_details(self, address, expected_date=None, txid=None):
         """
         Get details about transactions involving this address
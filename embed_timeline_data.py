@@ -10,7 +10,7 @@ def create_standalone_timeline():
     """Create a single-file HTML with embedded JSON data"""
     
     # Read the timeline data from bitcoin_large_op_returns/op_return_data directory
-    with open('bitcoin_large_op_returns/op_return_data/timeline_data.json', 'r') as f:
+    with open('bitcoin_large_op_returns/op_return_data/timeline_data.json', 'r', encoding='utf-8') as f:
         timeline_data = json.load(f)
     
     # Read the HTML template
@@ -9,6 +9,12 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+# orjson writes the (large) timeline file much faster than the stdlib json module, but optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def is_interesting_text(content, file_type):
     """
     Determine if text content is interesting (human messages) vs technical/boring
@@ -71,12 +77,16 @@ def scan_op_return_data(data_dir='bitcoin_large_op_returns/op_return_data'):
     print(f"Scanning {len(block_dirs)} block directories...")
     
     for block_dir in block_dirs:
+        # List the block directory once - used for the metadata files and the has-file checks below
+        # (instead of a glob plus two exists() stats per OP_RETURN)
+        file_names = {entry.name for entry in os.scandir(block_dir)}
+        
         # Find all metadata JSON files
-        metadata_files = list(block_dir.glob('*_metadata.json'))
+        metadata_files = [block_dir / name for name in sorted(file_names) if name.endswith('_metadata.json')]
         
         for metadata_file in metadata_files:
             try:
-                with open(metadata_file, 'r') as f:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
                     metadata = json.load(f)
                 
                 # Extract relevant data
@@ -107,18 +117,17 @@ def scan_op_return_data(data_dir='bitcoin_large_op_returns/op_return_data'):
                 item_id = f"block_{block_num}_{txid}_{vout}"
                 
                 # Check if we have the actual file for preview
-                file_path = block_dir / f"tx_{txid}_{vout}.{file_type}"
-                decoded_path = block_dir / f"tx_{txid}_{vout}_decoded.txt"
+                decoded_name = f"tx_{txid}_{vout}_decoded.txt"
                 
-                has_file = file_path.exists()
-                has_decoded = decoded_path.exists()
+                has_file = f"tx_{txid}_{vout}.{file_type}" in file_names
+                has_decoded = decoded_name in file_names
                 
                 # Read preview text if available
                 preview = None
                 full_content = None
                 if has_decoded and file_type == 'text':
                     try:
-                        with open(decoded_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        with open(block_dir / decoded_name, 'r', encoding='utf-8', errors='ignore') as f:
                             content = f.read()
                             full_content = content
                             preview = content[:200] + ('...' if len(content) > 200 else '')
@@ -177,8 +186,13 @@ def main():
     if timeline_data:
         # Save to JSON file inside bitcoin_large_op_returns/op_return_data directory
         output_file = Path('bitcoin_large_op_returns/op_return_data') / 'timeline_data.json'
-        with open(output_file, 'w', newline='\n') as f:
-            json.dump(timeline_data, f, indent=2)
+        # orjson writes non-ASCII as UTF-8 rather than \u escapes - read the file back as utf-8
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(timeline_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', newline='\n') as f:
+                json.dump(timeline_data, f, indent=2)
         
         print(f"\n[SUCCESS] Successfully generated {output_file}")
         print(f"   Total items: {len(timeline_data)}")
@@ -0,0 +1,57 @@
+"""
+Migration: Add an index on scan_id to large_op_returns table
+Run this after updating models.py - file_type and block_number are already indexed
+"""
+import mysql.connector
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    """Add index on scan_id to large_op_returns table"""
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME')
+    }
+    
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    
+    try:
+        print("Adding scan_id index to large_op_returns table...")
+        
+        # Add index on scan_id if it doesn't exist
+        # (MySQL drops the implicit foreign key index once this one exists)
+        cursor.execute("""
+            SELECT COUNT(*) 
+            FROM INFORMATION_SCHEMA.STATISTICS 
+            WHERE TABLE_SCHEMA = %s 
+            AND TABLE_NAME = 'large_op_returns'
+            AND INDEX_NAME = 'idx_large_op_returns_scan_id'
+        """, (db_config['database'],))
+        
+        if cursor.fetchone()[0] == 0:
+            print("  Adding index on scan_id")
+            cursor.execute("""
+                CREATE INDEX idx_large_op_returns_scan_id 
+                ON large_op_returns(scan_id)
+            """)
+        else:
+            print("  Index on scan_id already exists")
+        
+        conn.commit()
+        print("Migration completed successfully!")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    migrate()
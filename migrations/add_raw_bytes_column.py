@@ -0,0 +1,76 @@
+"""
+Migration: Store OP_RETURN payloads as binary in large_op_returns table
+Adds a raw_bytes BLOB column and backfills it from the hex encoded raw_data column.
+Run with --drop-hex once the backfill has been verified to drop the old raw_data column.
+"""
+import mysql.connector
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate(drop_hex=False):
+    """Add raw_bytes column to large_op_returns table and backfill it from raw_data"""
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME')
+    }
+    
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    
+    try:
+        print("Adding raw_bytes column to large_op_returns table...")
+        
+        # Check which of the columns exist
+        cursor.execute("""
+            SELECT COLUMN_NAME 
+            FROM INFORMATION_SCHEMA.COLUMNS 
+            WHERE TABLE_SCHEMA = %s 
+            AND TABLE_NAME = 'large_op_returns'
+            AND COLUMN_NAME IN ('raw_data', 'raw_bytes')
+        """, (db_config['database'],))
+        
+        existing_columns = {row[0] for row in cursor.fetchall()}
+        
+        if 'raw_bytes' not in existing_columns:
+            print("  Adding column: raw_bytes")
+            cursor.execute("""
+                ALTER TABLE large_op_returns 
+                ADD COLUMN raw_bytes BLOB NULL 
+                COMMENT 'Raw OP_RETURN data - NULL for very large files (stored on disk only)'
+            """)
+        else:
+            print("  Column raw_bytes already exists, skipping")
+        
+        if 'raw_data' in existing_columns:
+            print("  Backfilling raw_bytes from raw_data")
+            cursor.execute("""
+                UPDATE large_op_returns 
+                SET raw_bytes = UNHEX(raw_data) 
+                WHERE raw_data IS NOT NULL AND raw_bytes IS NULL
+            """)
+            print(f"  Backfilled {cursor.rowcount} rows")
+            
+            if drop_hex:
+                print("  Dropping column: raw_data")
+                cursor.execute("ALTER TABLE large_op_returns DROP COLUMN raw_data")
+            else:
+                print("  Keeping raw_data - re-run with --drop-hex once raw_bytes is verified")
+        
+        conn.commit()
+        print("Migration completed successfully!")
+        
+    except Exception as e:
+        conn.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    migrate(drop_hex='--drop-hex' in sys.argv)
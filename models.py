@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, UniqueConstraint, CheckConstraint, Boolean, func, Numeric, Index, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, UniqueConstraint, CheckConstraint, Boolean, func, Numeric, Index, Text, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -284,7 +284,7 @@ class LargeOPReturn(Base):
     txid = Column(String(64), nullable=False)
     vout_index = Column(Integer, nullable=False)
     data_size = Column(Integer, nullable=False)
-    raw_data = Column(Text, nullable=True)  # Hex encoded - NULL for very large files (stored on disk only)
+    raw_bytes = Column(LargeBinary, nullable=True)  # Raw payload - NULL for very large files (stored on disk only)
     decoded_text = Column(Text)  # If it's text - using Text for large data
     file_type = Column(String(20))  # jpg, pdf, text, binary, etc.
     mime_type = Column(String(100))
@@ -307,6 +307,7 @@ class LargeOPReturn(Base):
     __table_args__ = (
         UniqueConstraint('txid', 'vout_index', name='unique_op_return_tx'),
         Index('idx_large_op_returns_block', 'block_number'),
+        Index('idx_large_op_returns_scan_id', 'scan_id'),
         Index('idx_large_op_returns_txid', 'txid'),
         Index('idx_large_op_returns_file_type', 'file_type'),
         Index('idx_large_op_returns_fee_rate', 'fee_rate'),
@@ -4,15 +4,24 @@ import sys
 import json
 import time
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from decimal import Decimal
+from multiprocessing import Pool
 import urllib.parse
+import numpy as np
 
 # Add parent directory to path to import btc_service
 sys.path.append(str(Path(__file__).parent.parent))
 from btc_service import BTCService
 
+# orjson is much faster than the stdlib json module, but optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +30,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def write_json_file(file_path, data):
+    """Write data to a JSON file, using orjson when it's available"""
+    if orjson is not None:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str))
+    else:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str)
+
 def ensure_log_directory():
     """Create log directory if it doesn't exist"""
     log_dir = Path(__file__).parent.parent / "log"
@@ -38,8 +56,7 @@ def save_run_summary(summary_data):
         log_dir = ensure_log_directory()
         summary_file = log_dir / generate_run_summary_filename()
         
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_data, f, indent=2, default=str)
+        write_json_file(summary_file, summary_data)
         
         logger.info(f"📄 Run summary saved to: {summary_file}")
         return str(summary_file)
@@ -47,33 +64,65 @@ def save_run_summary(summary_data):
         logger.error(f"❌ Error saving run summary: {e}")
         return None
 
+@dataclass(frozen=True)
+class MonitorAddresses:
+    """Addresses from all monitor sets, stored as parallel tuples indexed by position"""
+    addresses: tuple = ()
+    set_names: tuple = ()
+    owners: tuple = ()
+    details: tuple = ()
+    origin_blocks: tuple = ()
+    
+    def __len__(self):
+        return len(self.addresses)
+
+def _load_monitor_set_file(json_file):
+    """Load a single monitor set JSON file - returns (set_name, data, error)"""
+    try:
+        with open(json_file, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return json_file.stem, data, None
+    except Exception as e:
+        return json_file.stem, [], str(e)
+
 def load_all_monitor_sets():
     """Load all addresses from all monitor set JSON files"""
     monitor_sets_dir = Path(__file__).parent
     json_files = list(monitor_sets_dir.glob("*.json"))
     
-    all_addresses = {}  # address -> {set_name, owner, details}
+    # Decode the files across processes - only worth the pool overhead for several files
+    if len(json_files) >= 4:
+        with Pool() as pool:
+            results = pool.map(_load_monitor_set_file, json_files)
+    else:
+        results = [_load_monitor_set_file(json_file) for json_file in json_files]
     
-    for json_file in json_files:
-        set_name = json_file.stem
+    # Collect into a dict first so a later set overrides an earlier one for the same address
+    address_info = {}  # address -> (set_name, owner, details, origin_block)
+    
+    for json_file, (set_name, data, error) in zip(json_files, results):
         logger.info(f"📂 Loading monitor set: {set_name}")
         
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            for item in data:
-                if isinstance(item, dict) and 'address' in item:
-                    address = item['address']
-                    all_addresses[address] = {
-                        'set_name': set_name,
-                        'owner': item.get('owner', 'Unknown'),
-                        'details': item.get('details', ''),
-                        'origin_block': item.get('origin_block')
-                    }
-                    
-        except Exception as e:
-            logger.error(f"❌ Error loading {json_file}: {e}")
+        if error:
+            logger.error(f"❌ Error loading {json_file}: {error}")
+            continue
+        
+        for item in data:
+            if isinstance(item, dict) and 'address' in item:
+                address_info[item['address']] = (
+                    set_name,
+                    item.get('owner', 'Unknown'),
+                    item.get('details', ''),
+                    item.get('origin_block')
+                )
+    
+    # Freeze into parallel tuples once - the activity check only reads from them
+    if address_info:
+        set_names, owners, details, origin_blocks = zip(*address_info.values())
+        all_addresses = MonitorAddresses(tuple(address_info), set_names, owners, details, origin_blocks)
+    else:
+        all_addresses = MonitorAddresses()
     
     logger.info(f"📋 Loaded {len(all_addresses)} addresses from {len(json_files)} monitor sets")
     return all_addresses
@@ -88,27 +137,52 @@ def ensure_activity_directory(set_name):
     activity_dir.mkdir(exist_ok=True)
     return activity_dir
 
+def migrate_legacy_activity_file(activity_dir, address):
+    """Convert a legacy {address}.json activity array to the {address}.jsonl format"""
+    legacy_file = activity_dir / f"{address}.json"
+    activity_file = activity_dir / f"{address}.jsonl"
+    
+    if not legacy_file.exists() or activity_file.exists():
+        return activity_file
+    
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = data if isinstance(data, list) else []
+        
+        # Legacy files are newest first - JSONL files are appended oldest first
+        records.sort(key=lambda x: (x.get('block_number') or 0, x.get('date') or ''))
+        
+        if save_activity_data(activity_file, records):
+            legacy_file.unlink()
+            logger.info(f"🔁 Migrated {legacy_file.name} to {activity_file.name}")
+    except Exception as e:
+        logger.warning(f"⚠️ Error migrating legacy activity file {legacy_file}: {e}")
+    
+    return activity_file
+
 def load_existing_activity(activity_file_path):
-    """Load existing activity data for an address"""
+    """Load existing activity data for an address (one JSON record per line)"""
     if not activity_file_path.exists():
         return []
     
     try:
-        with open(activity_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
+        with open(activity_file_path, 'rb') as f:
+            loads = orjson.loads if orjson is not None else json.loads
+            return [loads(line) for line in f if line.strip()]
     except Exception as e:
         logger.warning(f"⚠️ Error loading existing activity from {activity_file_path}: {e}")
         return []
 
-def save_activity_data(activity_file_path, activity_data):
-    """Save activity data to file"""
+def save_activity_data(activity_file_path, new_activities):
+    """Append new activity records to file (one JSON record per line)"""
     try:
-        # Sort by date (newest first)
-        activity_data.sort(key=lambda x: x.get('date', ''), reverse=True)
-        
-        with open(activity_file_path, 'w', encoding='utf-8') as f:
-            json.dump(activity_data, f, indent=2, default=str)
+        with open(activity_file_path, 'ab') as f:
+            for record in new_activities:
+                if orjson is not None:
+                    f.write(orjson.dumps(record, default=str) + b'\n')
+                else:
+                    f.write((json.dumps(record, default=str) + '\n').encode('utf-8'))
         return True
     except Exception as e:
         logger.error(f"❌ Error saving activity to {activity_file_path}: {e}")
@@ -135,35 +209,77 @@ def get_address_transactions(btc_service, wallet_name, address):
         logger.debug(f"Error getting transactions for {address}: {e}")
         return []
 
-def get_transaction_details(btc_service, txid, address):
+def get_wallet_transactions(btc_service, wallet_name):
+    """Get the txids for every address in a wallet with a single call - returns address -> txids"""
+    try:
+        # Temporarily override wallet path
+        original_wallet_path = btc_service.wallet_path
+        btc_service.wallet_path = wallet_name
+        
+        try:
+            received = btc_service._call_rpc("listreceivedbyaddress", [0, True, True])
+        finally:
+            # Restore wallet path
+            btc_service.wallet_path = original_wallet_path
+        
+        return {r['address']: r.get('txids', []) for r in received or [] if r.get('address')}
+    except Exception as e:
+        logger.warning(f"⚠️ Error getting transactions for wallet {wallet_name}: {e}")
+        return None
+
+def get_transaction_block_hashes(btc_service, wallet_name, txids):
+    """Get the containing block hash for each txid from its wallet in one batched call"""
+    if not txids:
+        return {}
+    
+    try:
+        # Temporarily override wallet path
+        original_wallet_path = btc_service.wallet_path
+        btc_service.wallet_path = wallet_name
+        
+        try:
+            results = btc_service._call_rpc_batch([("gettransaction", [txid, True]) for txid in txids])
+        finally:
+            # Restore wallet path
+            btc_service.wallet_path = original_wallet_path
+        
+        return {
+            txid: result.get('blockhash')
+            for txid, result in zip(txids, results)
+            if result and result.get('blockhash')
+        }
+    except Exception as e:
+        logger.debug(f"Error getting block hashes from wallet {wallet_name}: {e}")
+        return {}
+
+def get_transaction_details(btc_service, txid, address, block_hash=None):
     """Get detailed transaction information for a specific address"""
     try:
-        # Get raw transaction
-        raw_tx = btc_service._call_rpc("getrawtransaction", [txid, True])
+        # Get raw transaction - passing the block hash lets the node skip the txindex lookup
+        if block_hash:
+            raw_tx = btc_service._call_rpc("getrawtransaction", [txid, True, block_hash], parse_float=Decimal)
+        else:
+            raw_tx = btc_service._call_rpc("getrawtransaction", [txid, True], parse_float=Decimal)
         
         # Find the output that pays to our address
-        amount = Decimal('0')
-        found_output = False
+        vouts = raw_tx['vout']
+        output_addresses = [vout['scriptPubKey'].get('address') for vout in vouts]
         
-        for vout in raw_tx['vout']:
-            script_pub_key = vout['scriptPubKey']
-            output_addresses = []
-            
-            # Handle both address formats
-            if 'address' in script_pub_key:
-                output_addresses.append(script_pub_key['address'])
-            elif 'addresses' in script_pub_key:
-                output_addresses.extend(script_pub_key['addresses'])
-            
-            if address in output_addresses:
-                amount = Decimal(str(vout['value']))
-                found_output = True
-                break
+        if address in output_addresses:
+            vout_index = output_addresses.index(address)
+        else:
+            # Fall back to the older multi-address format
+            vout_index = next(
+                (i for i, vout in enumerate(vouts) if address in vout['scriptPubKey'].get('addresses', [])),
+                None
+            )
         
-        if not found_output:
+        if vout_index is None:
             logger.warning(f"⚠️ Address {address} not found in transaction {txid} outputs")
             return None
         
+        amount = vouts[vout_index]['value']
+        
         # Get block information
         block_hash = raw_tx.get('blockhash')
         block_info = None
@@ -172,7 +288,7 @@ def get_transaction_details(btc_service, txid, address):
         
         if block_hash:
             try:
-                block_info = btc_service._call_rpc("getblock", [block_hash])
+                block_info = btc_service._call_rpc("getblockheader", [block_hash])
                 block_number = block_info.get('height')
                 block_time = datetime.fromtimestamp(block_info.get('time', 0))
             except Exception as e:
@@ -191,6 +307,47 @@ def get_transaction_details(btc_service, txid, address):
         logger.error(f"❌ Error getting transaction details for {txid}: {e}")
         return None
 
+def format_utxos(utxos):
+    """Format raw listunspent entries (parsed with Decimal amounts) - returns (utxo_data, total_balance)"""
+    utxo_data = []
+    total_balance = Decimal('0')
+    
+    for utxo in utxos:
+        amount = utxo.get('amount', Decimal('0'))
+        total_balance += amount
+        
+        utxo_data.append({
+            'txid': utxo.get('txid'),
+            'vout': utxo.get('vout'),
+            'amount': float(amount),
+            'confirmations': utxo.get('confirmations', 0),
+            'spendable': utxo.get('spendable', False),
+            'safe': utxo.get('safe', False)
+        })
+    
+    return utxo_data, float(total_balance)
+
+def get_wallet_utxos(btc_service, wallet_name):
+    """Get the UTXOs for every address in a wallet with a single call - returns address -> utxos"""
+    try:
+        # Temporarily override wallet path
+        original_wallet_path = btc_service.wallet_path
+        btc_service.wallet_path = wallet_name
+        
+        try:
+            utxos = btc_service._call_rpc("listunspent", [0, 9999999], parse_float=Decimal)
+        finally:
+            # Restore wallet path
+            btc_service.wallet_path = original_wallet_path
+        
+        utxos_by_address = {}
+        for utxo in utxos or []:
+            utxos_by_address.setdefault(utxo.get('address'), []).append(utxo)
+        return utxos_by_address
+    except Exception as e:
+        logger.warning(f"⚠️ Error getting UTXOs for wallet {wallet_name}: {e}")
+        return None
+
 def get_address_utxos(btc_service, wallet_name, address):
     """Get current UTXOs for an address"""
     try:
@@ -199,44 +356,45 @@ def get_address_utxos(btc_service, wallet_name, address):
         btc_service.wallet_path = wallet_name
         
         # Get UTXOs
-        utxos = btc_service._call_rpc("listunspent", [0, 9999999, [address]])
+        utxos = btc_service._call_rpc("listunspent", [0, 9999999, [address]], parse_float=Decimal)
         
         # Restore wallet path
         btc_service.wallet_path = original_wallet_path
         
-        # Format UTXO data
-        utxo_data = []
-        total_balance = Decimal('0')
-        
-        for utxo in utxos:
-            amount = Decimal(str(utxo.get('amount', 0)))
-            total_balance += amount
-            
-            utxo_data.append({
-                'txid': utxo.get('txid'),
-                'vout': utxo.get('vout'),
-                'amount': float(amount),
-                'confirmations': utxo.get('confirmations', 0),
-                'spendable': utxo.get('spendable', False),
-                'safe': utxo.get('safe', False)
-            })
-        
-        return utxo_data, float(total_balance)
+        return format_utxos(utxos)
         
     except Exception as e:
         logger.debug(f"Error getting UTXOs for {address}: {e}")
         return [], 0.0
 
-def check_address_activity(btc_service, address, address_info):
-    """Check for new activity on a specific address"""
-    set_name = address_info['set_name']
+def compute_running_balances(starting_balance, amounts):
+    """Running balance after each amount, starting from starting_balance"""
+    # Only worth handing off to NumPy for long histories
+    if len(amounts) > 128:
+        # Seed the cumulative sum with the starting balance so the additions happen in the same order
+        return np.cumsum(np.concatenate(([starting_balance], amounts)))[1:].tolist()
+    
+    balances = []
+    balance = starting_balance
+    for amount in amounts:
+        balance += amount
+        balances.append(balance)
+    return balances
+
+def check_address_activity(btc_service, address, set_name, wallet_txids=None, wallet_utxos=None):
+    """Check for new activity on a specific address
+    
+    wallet_txids and wallet_utxos are the address -> txids and address -> utxos maps for
+    the address's wallet (from get_wallet_transactions/get_wallet_utxos). When they
+    aren't available the address is queried on its own.
+    """
     wallet_name = get_wallet_name_from_set(set_name)
     
     logger.debug(f"🔍 Checking activity for {address} (wallet: {wallet_name})")
     
     # Ensure activity directory exists
     activity_dir = ensure_activity_directory(set_name)
-    activity_file = activity_dir / f"{address}.json"
+    activity_file = migrate_legacy_activity_file(activity_dir, address)
     
     # Load existing activity
     existing_activity = load_existing_activity(activity_file)
@@ -244,13 +402,16 @@ def check_address_activity(btc_service, address, address_info):
     
     # Get current transactions
     try:
-        current_txids = get_address_transactions(btc_service, wallet_name, address)
+        if wallet_txids is not None:
+            current_txids = wallet_txids.get(address, [])
+        else:
+            current_txids = get_address_transactions(btc_service, wallet_name, address)
     except Exception as e:
         logger.warning(f"⚠️ Error getting transactions for {address}: {e}")
         return False, []
     
-    # Find new transactions
-    new_txids = [txid for txid in current_txids if txid not in existing_txids]
+    # Find new transactions (a tx paying the address more than once is listed once per output)
+    new_txids = list(set(current_txids) - existing_txids)
     
     if not new_txids:
         logger.debug(f"ℹ️ No new transactions for {address}")
@@ -274,8 +435,9 @@ def check_address_activity(btc_service, address, address_info):
     
     # Process new transactions in chronological order
     new_tx_details = []
+    block_hashes = get_transaction_block_hashes(btc_service, wallet_name, new_txids)
     for txid in new_txids:
-        tx_details = get_transaction_details(btc_service, txid, address)
+        tx_details = get_transaction_details(btc_service, txid, address, block_hashes.get(txid))
         if tx_details:
             new_tx_details.append(tx_details)
     
@@ -285,13 +447,16 @@ def check_address_activity(btc_service, address, address_info):
         x.get('date', '')
     ))
     
-    # Build activity records
-    for tx_details in new_tx_details:
-        running_balance += tx_details['amount']
-        
-        # Get current UTXOs
+    # Get current UTXOs
+    if wallet_utxos is not None:
+        utxos, current_balance = format_utxos(wallet_utxos.get(address, []))
+    else:
         utxos, current_balance = get_address_utxos(btc_service, wallet_name, address)
-        
+    
+    balances = compute_running_balances(running_balance, [tx_details['amount'] for tx_details in new_tx_details])
+    
+    # Build activity records
+    for tx_details, running_balance in zip(new_tx_details, balances):
         activity_record = {
             'txid': tx_details['txid'],
             'block_number': tx_details['block_number'],
@@ -307,10 +472,8 @@ def check_address_activity(btc_service, address, address_info):
         new_activities.append(activity_record)
         logger.info(f"  📝 Transaction {tx_details['txid'][:16]}... | Amount: {tx_details['amount']} BTC | Balance: {current_balance} BTC")
     
-    # Combine with existing activity and save
-    all_activity = existing_activity + new_activities
-    
-    if save_activity_data(activity_file, all_activity):
+    # Append only the new activity to the file
+    if save_activity_data(activity_file, new_activities):
         logger.info(f"💾 Saved {len(new_activities)} new activities for {address}")
         return True, new_activities
     else:
@@ -324,19 +487,36 @@ def check_all_activity(btc_service, addresses):
     success_count = 0
     error_count = 0
     address_activities = {}  # address -> activity data for summary
+    txids_by_set = {}  # set_name -> address -> txids, fetched once per wallet
+    utxos_by_set = {}  # set_name -> address -> utxos, fetched once per wallet
     
-    for i, (address, address_info) in enumerate(addresses.items()):
+    for i in range(len(addresses)):
+        address = addresses.addresses[i]
+        set_name = addresses.set_names[i]
+        
+        # Static per-address fields for the summary
+        address_summary = {
+            'owner': addresses.owners[i],
+            'set_name': set_name,
+            'details': addresses.details[i],
+            'origin_block': addresses.origin_blocks[i]
+        }
+        
         try:
-            logger.info(f"📍 ({i+1}/{len(addresses)}) Checking {address} ({address_info['owner']})")
+            logger.info(f"📍 ({i+1}/{len(addresses)}) Checking {address} ({addresses.owners[i]})")
+            
+            if set_name not in txids_by_set:
+                wallet_name = get_wallet_name_from_set(set_name)
+                txids_by_set[set_name] = get_wallet_transactions(btc_service, wallet_name)
+                utxos_by_set[set_name] = get_wallet_utxos(btc_service, wallet_name)
             
-            success, new_activities = check_address_activity(btc_service, address, address_info)
+            success, new_activities = check_address_activity(
+                btc_service, address, set_name, txids_by_set[set_name], utxos_by_set[set_name]
+            )
             
             # Store activity data for summary
             address_activities[address] = {
-                'owner': address_info['owner'],
-                'set_name': address_info['set_name'],
-                'details': address_info.get('details', ''),
-                'origin_block': address_info.get('origin_block'),
+                **address_summary,
                 'success': success,
                 'new_activities': new_activities,
                 'activity_count': len(new_activities)
@@ -353,10 +533,7 @@ def check_all_activity(btc_service, addresses):
             
             # Store error info for summary
             address_activities[address] = {
-                'owner': address_info.get('owner', 'Unknown'),
-                'set_name': address_info.get('set_name', 'Unknown'),
-                'details': address_info.get('details', ''),
-                'origin_block': address_info.get('origin_block'),
+                **address_summary,
                 'success': False,
                 'error': str(e),
                 'new_activities': [],
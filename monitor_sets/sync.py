@@ -8,6 +8,7 @@ import urllib.parse
 import requests
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import btc_service
 sys.path.append(str(Path(__file__).parent.parent))
@@ -21,6 +22,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Monitor sets live in independent wallets, so they can be synced concurrently
+MAX_SYNC_WORKERS = 4
+
+# origin block -> block timestamp, shared by every monitor set in the run
+block_timestamp_cache = {}
+
 def load_monitor_set(json_file_path):
     """Load addresses from a monitor set JSON file"""
     try:
@@ -100,7 +107,7 @@ def create_or_load_wallet(btc_service, wallet_name):
                     False,         # blank wallet
                     "",            # passphrase
                     False,         # avoid reuse
-                    False,         # descriptors - set to False for legacy wallet
+                    True,          # descriptors - legacy wallets are deprecated in Bitcoin Core
                     True           # load on startup
                 ])
                 logger.info(f"✅ Created new watch-only wallet: {wallet_name}")
@@ -112,8 +119,117 @@ def create_or_load_wallet(btc_service, wallet_name):
             logger.error(f"❌ Failed to load wallet with unexpected error: {e}")
             return False
 
+def is_descriptor_wallet(btc_service, wallet_name):
+    """Check whether the wallet is a descriptor wallet (as opposed to a legacy wallet)"""
+    original_wallet_path = btc_service.wallet_path
+    btc_service.wallet_path = wallet_name
+    try:
+        wallet_info = btc_service._call_rpc("getwalletinfo")
+        return bool(wallet_info.get('descriptors'))
+    except Exception as e:
+        logger.debug(f"Error getting wallet info for {wallet_name}: {e}")
+        return False
+    finally:
+        btc_service.wallet_path = original_wallet_path
+
+def get_address_descriptors(btc_service, addresses):
+    """Get checksummed addr() descriptors for addresses - returns address -> descriptor"""
+    results = btc_service._call_rpc_batch([("getdescriptorinfo", [f"addr({address})"]) for address in addresses])
+    return {
+        address: f"addr({address})#{result['checksum']}"
+        for address, result in zip(addresses, results)
+        if result and result.get('checksum')
+    }
+
+def get_origin_block_timestamps(btc_service, origin_blocks):
+    """Get block timestamps for origin blocks - returns origin_block -> timestamp"""
+    missing_blocks = sorted({b for b in origin_blocks if b and b not in block_timestamp_cache})
+    
+    if missing_blocks:
+        try:
+            # Resolve hashes and then headers in two batched calls
+            block_hashes = btc_service._call_rpc_batch([("getblockhash", [b]) for b in missing_blocks])
+            lookups = [(b, h) for b, h in zip(missing_blocks, block_hashes) if h]
+            headers = btc_service._call_rpc_batch([("getblockheader", [h]) for _, h in lookups])
+            
+            for (origin_block, _), header in zip(lookups, headers):
+                if header and header.get('time'):
+                    block_timestamp_cache[origin_block] = header['time']
+        except Exception as e:
+            logger.warning(f"  ⚠️ Couldn't get timestamps for origin blocks: {e}")
+    
+    return {b: block_timestamp_cache[b] for b in origin_blocks if b in block_timestamp_cache}
+
+def post_wallet_rpc(btc_service, wallet_name, method, params, timeout=30):
+    """Make a wallet RPC call over direct HTTP for better timeout control"""
+    encoded_wallet_name = urllib.parse.quote(wallet_name)
+    wallet_url = f"http://{btc_service.host}:{btc_service.port}/wallet/{encoded_wallet_name}"
+    
+    headers = {'content-type': 'application/json'}
+    payload = {
+        "jsonrpc": "1.0",
+        "id": "crypto-basis-sync",
+        "method": method,
+        "params": params
+    }
+    
+    auth = (btc_service.user, btc_service.password)
+    
+    return requests.post(wallet_url, json=payload, headers=headers, auth=auth, timeout=timeout)
+
+def send_import_request(btc_service, wallet_name, method, params, imported_addresses):
+    """Send an importdescriptors/importmulti request and report per-address results"""
+    response = post_wallet_rpc(btc_service, wallet_name, method, params)
+    
+    if response.status_code == 200:
+        result = response.json()
+        if result.get('error'):
+            logger.error(f"❌ Import failed: {result['error']}")
+            return False
+        
+        # Process results
+        if 'result' in result and result['result']:
+            result_list = result['result']
+            success_count = sum(1 for r in result_list if r.get('success'))
+            logger.info(f"✅ Successfully imported {success_count} of {len(imported_addresses)} addresses")
+            
+            # Show errors if any
+            for i, r in enumerate(result_list):
+                if not r.get('success'):
+                    addr = imported_addresses[i]
+                    error = r.get('error', {}).get('message', 'Unknown error')
+                    logger.warning(f"⚠️ Failed to import {addr}: {error}")
+            
+            return success_count > 0
+        return False
+    else:
+        logger.error(f"❌ HTTP error: {response.status_code}")
+        return False
+
+def start_wallet_rescan(btc_service, wallet_name, start_height):
+    """Kick off a single rescanblockchain for the wallet from start_height"""
+    logger.info(f"🔄 Rescanning wallet {wallet_name} from block {start_height}...")
+    
+    try:
+        # Use short timeout - the rescan keeps running on the node after we stop waiting
+        response = post_wallet_rpc(btc_service, wallet_name, "rescanblockchain", [start_height])
+        
+        if response.status_code == 200 and not response.json().get('error'):
+            logger.info(f"✅ Rescan complete")
+            return True
+        
+        logger.error(f"❌ Rescan failed: {response.text}")
+        return False
+    except requests.exceptions.Timeout:
+        logger.info(f"ℹ️ Rescan is running on the node (progress is reported by getwalletinfo 'scanning')")
+        return True
+
 def import_addresses_to_wallet(btc_service, wallet_name, addresses_to_import):
-    """Import addresses to a specific wallet using importmulti"""
+    """Import addresses to a specific wallet using importdescriptors (importmulti for legacy wallets)
+
+    Addresses are imported without rescanning, then the wallet is rescanned once
+    from the earliest origin block.
+    """
     if not addresses_to_import:
         logger.info(f"ℹ️ No new addresses to import for wallet {wallet_name}")
         return True
@@ -125,95 +241,73 @@ def import_addresses_to_wallet(btc_service, wallet_name, addresses_to_import):
     try:
         logger.info(f"📥 Importing {len(addresses_to_import)} addresses to wallet {wallet_name}")
         
-        # Prepare importmulti requests
-        import_requests = []
-        for addr_info in addresses_to_import:
-            address = addr_info['address']
-            origin_block = addr_info.get('origin_block')
-            
-            # Get timestamp from origin block if available
-            start_timestamp = None
-            if origin_block:
-                try:
-                    block_hash = btc_service._call_rpc("getblockhash", [origin_block])
-                    block_info = btc_service._call_rpc("getblockheader", [block_hash])
-                    start_timestamp = block_info.get('time')
-                    if start_timestamp:
-                        start_date = datetime.fromtimestamp(start_timestamp)
-                        logger.debug(f"  📅 {address} origin block {origin_block}: {start_date.strftime('%Y-%m-%d')}")
-                except Exception as e:
-                    logger.warning(f"  ⚠️ Couldn't get timestamp for block {origin_block}: {e}")
+        if is_descriptor_wallet(btc_service, wallet_name):
+            descriptors = get_address_descriptors(btc_service, [a['address'] for a in addresses_to_import])
+            imported_addresses = []
+            import_requests = []
+            for addr_info in addresses_to_import:
+                address = addr_info['address']
+                if address not in descriptors:
+                    logger.warning(f"⚠️ Couldn't get descriptor for {address}, skipping")
+                    continue
+                imported_addresses.append(address)
+                import_requests.append({
+                    "desc": descriptors[address],
+                    "timestamp": "now",  # Skip the per-import rescan
+                    "active": False,
+                    "internal": False,
+                    "label": f"{wallet_name}-{address[:8]}"
+                })
             
-            # Use genesis block timestamp if no origin block
-            if not start_timestamp:
-                start_timestamp = 1231006505  # Close to Bitcoin genesis
+            logger.info(f"🔄 Executing importdescriptors for {len(import_requests)} addresses...")
+            imported = send_import_request(btc_service, wallet_name, "importdescriptors", [import_requests], imported_addresses)
+        else:
+            # Legacy wallets don't support descriptors - fall back to importmulti
+            timestamps_by_block = get_origin_block_timestamps(
+                btc_service, [a.get('origin_block') for a in addresses_to_import]
+            )
+            import_requests = []
+            for addr_info in addresses_to_import:
+                address = addr_info['address']
+                origin_block = addr_info.get('origin_block')
+                
+                # Get timestamp from origin block if available
+                start_timestamp = timestamps_by_block.get(origin_block)
+                if start_timestamp:
+                    start_date = datetime.fromtimestamp(start_timestamp)
+                    logger.debug(f"  📅 {address} origin block {origin_block}: {start_date.strftime('%Y-%m-%d')}")
+                elif origin_block:
+                    logger.warning(f"  ⚠️ Couldn't get timestamp for block {origin_block}")
+                
+                # Use genesis block timestamp if no origin block
+                if not start_timestamp:
+                    start_timestamp = 1231006505  # Close to Bitcoin genesis
+                
+                import_requests.append({
+                    "scriptPubKey": {"address": address},
+                    "timestamp": start_timestamp,
+                    "watchonly": True,
+                    "label": f"{wallet_name}-{address[:8]}",
+                    "rescan": False
+                })
             
-            import_requests.append({
-                "scriptPubKey": {"address": address},
-                "timestamp": start_timestamp,
-                "watchonly": True,
-                "label": f"{wallet_name}-{address[:8]}",
-                "rescan": True
-            })
+            # Execute importmulti
+            logger.info(f"🔄 Executing importmulti for {len(import_requests)} addresses...")
+            imported = send_import_request(
+                btc_service, wallet_name, "importmulti", [import_requests, {"rescan": False}],
+                [a['address'] for a in addresses_to_import]
+            )
         
-        # Execute importmulti
-        logger.info(f"🔄 Executing importmulti for {len(import_requests)} addresses...")
-        
-        # Use direct HTTP call for better timeout control
-        encoded_wallet_name = urllib.parse.quote(wallet_name)
-        import_url = f"http://{btc_service.host}:{btc_service.port}/wallet/{encoded_wallet_name}"
-        
-        headers = {'content-type': 'application/json'}
-        payload = {
-            "jsonrpc": "1.0",
-            "id": "crypto-basis-sync",
-            "method": "importmulti", 
-            "params": [import_requests, {"rescan": True}]
-        }
-        
-        auth = (btc_service.user, btc_service.password)
+        if not imported:
+            return False
         
-        try:
-            # Use short timeout as we expect this might timeout for large imports
-            response = requests.post(import_url, json=payload, headers=headers, auth=auth, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('error'):
-                    logger.error(f"❌ Import failed: {result['error']}")
-                    return False
-                
-                # Process results
-                if 'result' in result and result['result']:
-                    result_list = result['result']
-                    success_count = sum(1 for r in result_list if r.get('success'))
-                    logger.info(f"✅ Successfully imported {success_count} of {len(import_requests)} addresses")
-                    
-                    # Show errors if any
-                    for i, r in enumerate(result_list):
-                        if not r.get('success'):
-                            addr = addresses_to_import[i]['address']
-                            error = r.get('error', {}).get('message', 'Unknown error')
-                            logger.warning(f"⚠️ Failed to import {addr}: {error}")
-                    
-                    return success_count > 0
-            else:
-                logger.error(f"❌ HTTP error: {response.status_code}")
-                return False
-                
-        except requests.exceptions.Timeout:
-            # Timeout is expected for large imports - operation continues on node
-            logger.info(f"ℹ️ Import request timed out (expected for large rescans)")
-            logger.info(f"✅ Import command sent successfully, rescan happening on node")
-            return True
+        # One rescan covers every imported address
+        start_height = min(a.get('origin_block') or 0 for a in addresses_to_import)
+        return start_wallet_rescan(btc_service, wallet_name, start_height)
             
     except Exception as e:
-        if "timeout" in str(e).lower():
-            logger.info(f"ℹ️ Import timed out (expected behavior)")
-            return True
-        else:
-            logger.error(f"❌ Error importing addresses: {e}")
-            return False
+        logger.error(f"❌ Error importing addresses: {e}")
+        return False
     finally:
         # Restore original wallet path
         btc_service.wallet_path = original_wallet_path
@@ -260,6 +354,18 @@ def sync_monitor_set(json_file_path, btc_service):
     logger.info(f"✅ Successfully synced monitor set: {Path(json_file_path).stem}")
     return True
 
+def sync_monitor_set_worker(json_file):
+    """Sync a single monitor set file in a worker thread"""
+    # Each worker gets its own BTCService - wallet_path is swapped per wallet and can't be shared
+    btc_service = BTCService(test_connection=False)
+    try:
+        return sync_monitor_set(json_file, btc_service)
+    except Exception as e:
+        logger.error(f"❌ Error processing {json_file}: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def main():
     """Main sync function"""
     print("🔄 Monitor Sets Sync Tool")
@@ -283,16 +389,10 @@ def main():
     
     logger.info(f"📋 Found {len(json_files)} JSON files to process")
     
-    # Process each JSON file
-    success_count = 0
-    for json_file in json_files:
-        try:
-            if sync_monitor_set(json_file, btc_service):
-                success_count += 1
-        except Exception as e:
-            logger.error(f"❌ Error processing {json_file}: {e}")
-            import traceback
-            traceback.print_exc()
+    # Process the JSON files concurrently
+    with ThreadPoolExecutor(max_workers=MAX_SYNC_WORKERS) as executor:
+        results = list(executor.map(sync_monitor_set_worker, json_files))
+    success_count = sum(1 for result in results if result)
     
     print(f"\n📊 Sync Summary:")
     print(f"   ✅ Successfully synced: {success_count}")
@@ -1,5 +1,10 @@
 import os
+import re
+import sys
 import json
+import base64
+import struct
+import hashlib
 import logging
 import subprocess
 from datetime import datetime
@@ -7,9 +12,31 @@ from dotenv import load_dotenv
 from btc_service import BTCService
 from pathlib import Path
 import binascii
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import Pool
 from db_config import SessionLocal, init_db
 from models import OPReturnScan, LargeOPReturn
-from sqlalchemy import func
+from sqlalchemy import func, text
+
+# pyahocorasick matches every pool signature in one pass, but is optional
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# orjson serialises metadata much faster than the stdlib json module, but optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Timeline generator lives next to this script; imported once rather than re-executed per regeneration
+try:
+    import generate_timeline_data
+except ImportError:
+    generate_timeline_data = None
 
 # Configure logging
 logging.basicConfig(
@@ -19,16 +46,512 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def read_json_file(file_path):
+    """Read a JSON file, using orjson when it's available"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_new_file(file_path, data):
+    """Create file_path with data unless it already exists - returns True if it was created
+    
+    Uses an exclusive create, so there's no separate exists() check.
+    """
+    try:
+        with open(file_path, 'xb') as f:
+            f.write(data)
+        return True
+    except FileExistsError:
+        return False
+
+
+def write_json_file(file_path, data):
+    """Write data to a JSON file, using orjson when it's available
+    
+    Written to a temporary file and renamed into place so readers never see a partial file.
+    """
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, indent=2).encode('utf-8')
+    
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+
+def update_metadata_types(metadata_file, file_type, mime_type):
+    """Set file_type/mime_type in a metadata JSON file
+    
+    Returns True if the file was rewritten, False if it already had these types
+    (e.g. from an interrupted run) and None if there's no metadata file.
+    """
+    try:
+        metadata = read_json_file(metadata_file)
+    except FileNotFoundError:
+        return None
+    
+    if metadata.get('file_type') == file_type and metadata.get('mime_type') == mime_type:
+        return False
+    
+    metadata['file_type'] = file_type
+    metadata['mime_type'] = mime_type
+    write_json_file(metadata_file, metadata)
+    logger.debug(f"   ✓ Updated metadata file {metadata_file.name}")
+    return True
+
+# Data URI header (e.g., data:image/png;base64,) - matched on the raw bytes, after any leading whitespace
+DATA_URI_HEADER_PATTERN = re.compile(rb'\s*data:(image|video|audio|application)/([a-zA-Z0-9\-\+\.]+);base64,')
+
+# ASCII bytes that count as text (str.isprintable() or str.isspace())
+TEXT_BYTES = bytes(b for b in range(128) if chr(b).isprintable() or chr(b).isspace())
+
+# Byte translation tables shared by the hot paths (bytes.translate runs in C)
+ASCII_LOWER_TABLE = bytes.maketrans(bytes(range(0x41, 0x5B)), bytes(range(0x61, 0x7B)))
+NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+
+# str.translate map dropping ASCII characters - leaves only the characters is_text has to check one by one
+ASCII_DELETE_MAP = dict.fromkeys(range(0x80))
+
+# (file_type, mime_type) stored for payloads without a detected file type
+TEXT_TYPE = ('text', 'text/plain')
+BINARY_TYPE = ('binary', 'application/octet-stream')
+
+# Detected file types whose payload can still be text (everything else is known binary)
+TEXT_FILE_TYPES = {'json', 'xml', 'txt', 'html', 'svg'}
+
+# File types that are never written to disk (only their metadata is kept)
+DANGEROUS_TYPES = frozenset({'exe', 'elf'})
+
+# Transactions fetched per batched RPC call when re-scanning large OP_RETURNs
+RESCAN_BATCH_SIZE = 100
+
+# Blocks committed at a time when scanning a range (each block gets its own savepoint)
+SCAN_COMMIT_BLOCKS = 10
+
+# Batches applied per commit when re-scanning (each batch gets its own savepoint)
+RESCAN_COMMIT_BATCHES = 10
+
+# LargeOPReturn rows loaded (and committed) at a time when reinterpreting file types
+REINTERPRET_CHUNK_SIZE = 500
+
+# Threads writing files in the background when reinterpreting file types
+REINTERPRET_IO_WORKERS = 4
+
+# Threads writing OP_RETURN files in the background when scanning a range
+SCAN_IO_WORKERS = 4
+
+# Payloads handed to each --jobs worker process at a time when reinterpreting
+REINTERPRET_JOB_CHUNK_SIZE = 50
+
+# Common mining pool signatures found in coinbase text
+# Order matters - earlier signatures win when more than one matches
+POOL_SIGNATURES = {
+    'ViaBTC': 'ViaBTC',
+    'F2Pool': 'F2Pool',
+    'AntPool': 'AntPool',
+    'Foundry': 'Foundry USA',
+    'foundry': 'Foundry USA',
+    'Binance': 'Binance Pool',
+    'BTC.com': 'BTC.com',
+    'Poolin': 'Poolin',
+    'SlushPool': 'Slush Pool',
+    'MARA': 'Marathon Digital',
+    'marathon': 'Marathon Digital',
+    'SpiderPool': 'SpiderPool',
+    'SBI': 'SBI Crypto',
+    'EMCD': 'EMCD',
+    'Luxor': 'Luxor',
+    'BraiinsPool': 'Braiins Pool',
+    'stratum': 'Braiins Pool',
+    'ckpool': 'CKPool',
+    '/luckyPool/': 'luckyPool',
+    'luckyPool': 'luckyPool',
+    'ultimus': 'Ultimus Pool',
+    'SecPool': 'SecPool',
+}
+
+# Lowercased once at import - matching is case-insensitive
+POOL_SIGNATURES_LOWER = tuple((signature.lower(), pool_name) for signature, pool_name in POOL_SIGNATURES.items())
+
+
+def build_pool_automaton(signatures):
+    """Build an Aho-Corasick automaton over lowercased (signature, pool_name) pairs - values are (priority, pool_name)"""
+    automaton = ahocorasick.Automaton()
+    for priority, (signature_lower, pool_name) in enumerate(signatures):
+        existing = automaton.get(signature_lower, None)
+        if existing is None or existing[0] > priority:
+            automaton.add_word(signature_lower, (priority, pool_name))
+    automaton.make_automaton()
+    return automaton
+
+
+# Built once at import - every scanner shares it
+POOL_AUTOMATON = build_pool_automaton(POOL_SIGNATURES_LOWER) if ahocorasick is not None else None
+
+# File signatures for detection (magic numbers)
+# Order matters - when two entries share a signature the earlier one wins
+FILE_SIGNATURES = [
+    # Images
+    (b'\xFF\xD8\xFF', 'jpg', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'GIF87a', 'gif', 'image/gif'),
+    (b'GIF89a', 'gif', 'image/gif'),
+    (b'RIFF', 'webp', 'image/webp'),  # Also used by AVI - told apart with RIFF_FORMATS
+    (b'BM', 'bmp', 'image/bmp'),
+    (b'\x49\x49\x2A\x00', 'tiff', 'image/tiff'),  # Little-endian TIFF
+    (b'\x4D\x4D\x00\x2A', 'tiff', 'image/tiff'),  # Big-endian TIFF
+    (b'\x00\x00\x01\x00', 'ico', 'image/x-icon'),
+
+    # Documents
+    (b'%PDF', 'pdf', 'application/pdf'),
+    (b'\xD0\xCF\x11\xE0', 'doc', 'application/msword'),  # Old DOC format
+    (b'PK\x03\x04', 'zip', 'application/zip'),  # EPUB/DOCX/XLSX/PPTX told apart with detect_zip_format
+
+    # Archives
+    (b'\x37\x7A\xBC\xAF\x27\x1C', '7z', 'application/x-7z-compressed'),
+    (b'Rar!\x1A\x07\x00', 'rar', 'application/x-rar-compressed'),  # RAR 1.5+
+    (b'Rar!\x1A\x07\x01\x00', 'rar', 'application/x-rar-compressed'),  # RAR 5.0+
+    (b'\x1F\x8B', 'gz', 'application/gzip'),
+    (b'BZh', 'bz2', 'application/x-bzip2'),
+    (b'\x75\x73\x74\x61\x72', 'tar', 'application/x-tar'),  # At offset 257, but checking here
+
+    # Audio
+    (b'ID3', 'mp3', 'audio/mpeg'),
+    (b'\xFF\xFB', 'mp3', 'audio/mpeg'),  # MP3 without ID3
+    (b'\xFF\xF3', 'mp3', 'audio/mpeg'),  # MP3 without ID3
+    (b'fLaC', 'flac', 'audio/flac'),
+    (b'OggS', 'ogg', 'audio/ogg'),
+
+    # Video
+    (b'\x00\x00\x00\x18ftypmp42', 'mp4', 'video/mp4'),
+    (b'\x00\x00\x00\x20ftypmp42', 'mp4', 'video/mp4'),
+    (b'\x00\x00\x00\x18ftypisom', 'mp4', 'video/mp4'),
+    (b'\x00\x00\x00\x20ftypisom', 'mp4', 'video/mp4'),
+    (b'RIFF', 'avi', 'video/x-msvideo'),  # Shares the RIFF signature - see RIFF_FORMATS
+
+    # Executables
+    (b'MZ', 'exe', 'application/x-msdownload'),  # Windows PE
+    (b'\x7FELF', 'elf', 'application/x-executable'),  # Linux ELF
+
+    # Other
+    (b'{', 'json', 'application/json'),  # Simple JSON detection
+    (b'<?xml', 'xml', 'application/xml'),
+]
+
+# RIFF is a container - the form type at offset 8 tells the formats apart
+RIFF_FORMATS = {
+    b'WEBP': ('webp', 'image/webp'),
+    b'AVI ': ('avi', 'video/x-msvideo'),
+}
+
+
+# ZIP based containers - EPUB stores an uncompressed "mimetype" entry first (at offset 30),
+# Office Open XML documents are told apart by their top-level folder
+EPUB_MIMETYPE_ENTRY = b'mimetypeapplication/epub+zip'
+OOXML_FORMATS = (
+    (b'word/', 'docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    (b'xl/', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    (b'ppt/', 'pptx', 'application/vnd.openxmlformats-officedocument.presentationml.presentation'),
+)
+
+
+def detect_zip_format(data):
+    """Detect the document format inside a ZIP payload - returns (ext, mime), defaulting to plain zip"""
+    if data[30:30 + len(EPUB_MIMETYPE_ENTRY)] == EPUB_MIMETYPE_ENTRY:
+        return 'epub', 'application/epub+zip'
+    if b'[Content_Types].xml' in data:
+        for folder, ext, mime in OOXML_FORMATS:
+            if folder in data:
+                return ext, mime
+    return 'zip', 'application/zip'
+
+
+def detect_riff_format(data):
+    """Detect the format inside a RIFF payload from its form type - returns (ext, mime), defaulting to webp"""
+    return RIFF_FORMATS.get(data[8:12], ('webp', 'image/webp'))
+
+
+# Container signatures whose contents decide the final type - the detector only runs
+# when its container's signature matched (RIFF is listed as webp in FILE_SIGNATURES)
+CONTAINER_FORMATS = {
+    'webp': detect_riff_format,
+    'zip': detect_zip_format,
+}
+
+
+def build_signature_trie(signatures):
+    """Build a byte-wise trie of file signatures
+    
+    Leaves are stored under '_leaf' as (ext, mime, container_detector) - container_detector is None
+    unless the signature is a container listed in CONTAINER_FORMATS.
+    The walk stops at the first leaf, so a signature can't be a prefix of a different one
+    (that would silently change which entry wins) - identical signatures keep the first entry.
+    """
+    trie = {}
+    for signature, ext, mime in signatures:
+        node = trie
+        for byte in signature:
+            if '_leaf' in node:
+                raise ValueError(f"File signature {signature!r} starts with another signature")
+            node = node.setdefault(byte, {})
+        if '_leaf' not in node and len(node) > 0:
+            raise ValueError(f"File signature {signature!r} is a prefix of another signature")
+        node.setdefault('_leaf', (ext, mime, CONTAINER_FORMATS.get(ext)))
+    return trie
+
+
+SIGNATURE_TRIE = build_signature_trie(FILE_SIGNATURES)
+MAX_SIGNATURE_LENGTH = max(len(signature) for signature, _, _ in FILE_SIGNATURES)
+
+# Leading bytes that decide a payload's file type (signatures, the RIFF form type, a data URI prefix)
+SNIFF_LENGTH = 32
+
+# Shortest OP_RETURN script that can hold more than 83 bytes (OP_RETURN + OP_PUSHDATA1 + length + 84)
+MIN_LARGE_OP_RETURN_SCRIPT = 87
+
+# A push of more than 75 bytes needs OP_PUSHDATA1/2/4 right after OP_RETURN - as script bytes and as hex
+LARGE_PUSH_OPCODES = frozenset({0x4c, 0x4d, 0x4e})
+LARGE_OP_RETURN_PREFIXES = frozenset({'6a4c', '6a4d', '6a4e'})
+LARGE_OP_RETURN_MARKERS = (b'\x6a\x4c', b'\x6a\x4d', b'\x6a\x4e')
+
+
+def read_compact_size(raw, pos):
+    """Read a Bitcoin CompactSize integer - returns (value, position after it)"""
+    size = raw[pos]
+    if size < 0xfd:
+        return size, pos + 1
+    if size == 0xfd:
+        return struct.unpack_from('<H', raw, pos + 1)[0], pos + 3
+    if size == 0xfe:
+        return struct.unpack_from('<I', raw, pos + 1)[0], pos + 5
+    return struct.unpack_from('<Q', raw, pos + 1)[0], pos + 9
+
+
+def decode_raw_transaction(raw, tx_start, tx_end, segwit, coinbase=False):
+    """Decode one serialized transaction into a trimmed verbosity 2 style dict (txid, vsize, vin, vout)"""
+    pos = tx_start + (6 if segwit else 4)
+    body_start = pos
+    
+    vin = []
+    input_count, pos = read_compact_size(raw, pos)
+    for _ in range(input_count):
+        prev_txid = raw[pos:pos + 32][::-1].hex()
+        prev_vout = struct.unpack_from('<I', raw, pos + 32)[0]
+        script_len, pos = read_compact_size(raw, pos + 36)
+        if coinbase:
+            vin.append({'coinbase': raw[pos:pos + script_len].hex()})
+        else:
+            vin.append({'txid': prev_txid, 'vout': prev_vout})
+        pos += script_len + 4
+    
+    vout = []
+    output_count, pos = read_compact_size(raw, pos)
+    for n in range(output_count):
+        script_len, pos = read_compact_size(raw, pos + 8)
+        vout.append({'n': n, 'scriptPubKey': {'hex': raw[pos:pos + script_len].hex()}})
+        pos += script_len
+    
+    # The txid and base size leave out the segwit marker/flag and the witness data
+    if segwit:
+        stripped = raw[tx_start:tx_start + 4] + raw[body_start:pos] + raw[tx_end - 4:tx_end]
+    else:
+        stripped = raw[tx_start:tx_end]
+    txid = hashlib.sha256(hashlib.sha256(stripped).digest()).digest()[::-1].hex()
+    weight = len(stripped) * 3 + (tx_end - tx_start)
+    
+    return {'txid': txid, 'vsize': (weight + 3) // 4, 'vin': vin, 'vout': vout}
+
+
+def parse_raw_block(raw):
+    """Parse a serialized block (getblock verbosity 0) into a trimmed verbosity 2 style dict
+    
+    Only the coinbase and transactions with an output that could be a large OP_RETURN are decoded,
+    every other transaction is skipped over without building anything. 'nTx' has the full
+    transaction count. Values and fees aren't included - see fetch_transactions for those.
+    """
+    block_time = struct.unpack_from('<I', raw, 68)[0]
+    tx_count, pos = read_compact_size(raw, 80)
+    txs = []
+    
+    # Blocks without OP_RETURN + OP_PUSHDATA bytes anywhere can't have a large OP_RETURN - only the
+    # coinbase needs decoding (the byte search runs in C, any hits are checked by the walk below)
+    has_candidates = any(marker in raw for marker in LARGE_OP_RETURN_MARKERS)
+    
+    for tx_index in range(tx_count if has_candidates else 1):
+        tx_start = pos
+        segwit = raw[pos + 4] == 0  # Marker byte - a legacy tx can't have zero inputs here
+        pos += 6 if segwit else 4
+        
+        input_count, pos = read_compact_size(raw, pos)
+        for _ in range(input_count):
+            script_len, pos = read_compact_size(raw, pos + 36)
+            pos += script_len + 4
+        
+        keep = tx_index == 0
+        output_count, pos = read_compact_size(raw, pos)
+        for _ in range(output_count):
+            script_len, pos = read_compact_size(raw, pos + 8)
+            if script_len >= MIN_LARGE_OP_RETURN_SCRIPT and raw[pos] == 0x6a and raw[pos + 1] in LARGE_PUSH_OPCODES:
+                keep = True
+            pos += script_len
+        
+        if segwit:
+            for _ in range(input_count):
+                item_count, pos = read_compact_size(raw, pos)
+                for _ in range(item_count):
+                    item_len, pos = read_compact_size(raw, pos)
+                    pos += item_len
+        pos += 4  # Locktime
+        
+        if keep:
+            txs.append(decode_raw_transaction(raw, tx_start, pos, segwit, coinbase=tx_index == 0))
+    
+    return {'time': block_time, 'nTx': tx_count, 'tx': txs}
+
+
+def find_op_return_outputs(txs):
+    """Find the outputs that could hold a large OP_RETURN - returns a list of (tx, vout_index, script_hex)
+    
+    This runs for every output in every block, so it's a single comprehension with no method calls.
+    A payload over 83 bytes needs OP_RETURN + OP_PUSHDATA1/2/4 + length + 84 bytes = 174+ hex chars,
+    so small-push OP_RETURNs are rejected on the first 4 hex chars without decoding anything.
+    """
+    return [
+        (tx, vout_idx, script_hex)
+        for tx in txs
+        for vout_idx, vout in enumerate(tx['vout'])
+        if (script_hex := vout['scriptPubKey'].get('hex')) and script_hex[:4] in LARGE_OP_RETURN_PREFIXES
+        and len(script_hex) >= 174
+    ]
+
+# Map common data URI MIME types to extensions
+DATA_URI_EXTENSIONS = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'image/bmp': 'bmp',
+    'image/svg+xml': 'svg',
+    'video/mp4': 'mp4',
+    'video/webm': 'webm',
+    'audio/mpeg': 'mp3',
+    'audio/mp3': 'mp3',
+    'audio/ogg': 'ogg',
+    'audio/wav': 'wav',
+    'application/pdf': 'pdf',
+    'application/json': 'json',
+}
+
+
+def detect_file_type(data):
+    """Detect file type from binary data or data URI - returns (ext, mime, decoded_binary)
+    
+    Pure function of the payload bytes (no scanner state), decoded_binary is only set for data URIs.
+    """
+    # First check if this is a data URI (e.g., data:image/png;base64,...)
+    # Only look at the whole payload when it starts like one
+    try:
+        match = base64_data = None
+        if data[:SNIFF_LENGTH].lstrip().startswith(b'data:'):
+            match = DATA_URI_HEADER_PATTERN.match(data)
+            if match:
+                # Only the header goes through the regex - the rest is the base64 data (a single line)
+                base64_data = data[match.end():].rstrip()
+        if base64_data and b'\n' not in base64_data:
+            mime_category = match.group(1).decode('ascii')
+            mime_subtype = match.group(2).decode('ascii')
+            
+            # Interned so the many payloads sharing a MIME type share one string
+            full_mime = sys.intern(f'{mime_category}/{mime_subtype}')
+            ext = DATA_URI_EXTENSIONS.get(full_mime, mime_subtype)
+            
+            # Return the extension, mime type, and decoded binary data
+            try:
+                decoded_binary = base64.b64decode(base64_data)
+                return ext, full_mime, decoded_binary
+            except:
+                # If base64 decode fails, return the info but no decoded data
+                return ext, full_mime, None
+    except:
+        pass
+    
+    # Not a data URI, walk the signature trie (at most MAX_SIGNATURE_LENGTH steps)
+    node = SIGNATURE_TRIE
+    for byte in data[:MAX_SIGNATURE_LENGTH]:
+        node = node.get(byte)
+        if node is None:
+            break
+        if '_leaf' in node:
+            ext, mime, container_detector = node['_leaf']
+            if container_detector is not None:
+                ext, mime = container_detector(data)
+            return ext, mime, None
+    return None, None, None
+
+
+def sniff_payload(raw_bytes):
+    """Detect the file type of a stored payload - None if no raw bytes were stored (worker for --jobs)"""
+    if raw_bytes is None:
+        return None
+    return detect_file_type(bytes(raw_bytes))
+
+
+def build_file_type_update(updates):
+    """Build one UPDATE statement applying a chunk of file_type/mime_type changes - returns (sql, params)
+    
+    mysql-connector only batches INSERTs in executemany, an UPDATE would still be sent once per row.
+    MySQL has no UPDATE ... FROM VALUES, so the new values are picked per id with CASE instead.
+    """
+    params = {}
+    file_type_cases = []
+    mime_type_cases = []
+    ids = []
+    for i, update in enumerate(updates):
+        params[f"id{i}"] = update["id"]
+        params[f"ft{i}"] = update["file_type"]
+        params[f"mt{i}"] = update["mime_type"]
+        file_type_cases.append(f"WHEN :id{i} THEN :ft{i}")
+        mime_type_cases.append(f"WHEN :id{i} THEN :mt{i}")
+        ids.append(f":id{i}")
+    
+    sql = (
+        "UPDATE large_op_returns "
+        f"SET file_type = CASE id {' '.join(file_type_cases)} END, "
+        f"mime_type = CASE id {' '.join(mime_type_cases)} END "
+        f"WHERE id IN ({', '.join(ids)})"
+    )
+    return sql, params
+
+
 class OPReturnScanner:
-    def __init__(self, output_dir="bitcoin_large_op_returns/op_return_data", use_database=True, auto_sync_git=None):
+    def __init__(self, output_dir="bitcoin_large_op_returns/op_return_data", use_database=True, auto_sync_git=None, batch_size=10, fetch_workers=2, use_rpc=True):
         # Load environment variables
         load_dotenv()
         
-        self.btc_service = BTCService(test_connection=True)
+        # Stats, reinterpretation and timeline regeneration don't need a node (use_rpc=False)
+        self.btc_service = BTCService(test_connection=True) if use_rpc else None
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.use_database = use_database
         
+        # Number of blocks fetched per batched RPC request
+        # (verbosity 2 blocks are large, so keep this modest)
+        self.batch_size = max(1, batch_size)
+        # Number of batches fetched ahead in background threads while blocks are processed
+        self.fetch_workers = max(1, fetch_workers)
+        
+        # Background file writer - only active during scan_blocks, files are written inline otherwise
+        self.io_pool = None
+        self.pending_writes = []
+        
+        # Set once the node has been seen returning transactions without fees (pre-25.0 Bitcoin Core)
+        self.fee_fallback_warned = False
+        
         # Auto-sync git: check environment variable if not explicitly set
         if auto_sync_git is None:
             auto_sync_git = os.getenv('OP_RETURN_AUTO_SYNC_GIT', 'false').lower() in ('true', '1', 'yes')
@@ -37,6 +560,10 @@ class OPReturnScanner:
         # Get GitHub token for authentication
         self.github_token = os.getenv('GITHUB_TOKEN')
         
+        # Remote URL and push environment, filled in on the first git sync
+        self.git_remote_url = None
+        self.git_push_env = None
+        
         # Determine submodule root (parent of op_return_data directory)
         # If output_dir is bitcoin_large_op_returns/op_return_data, submodule_root is bitcoin_large_op_returns
         if 'op_return_data' in str(self.output_dir):
@@ -50,57 +577,10 @@ class OPReturnScanner:
             init_db()
             self.db = SessionLocal()
         
-        # File signatures for detection (magic numbers)
-        # Order matters - more specific signatures should come first
-        self.file_signatures = {
-            # Images
-            b'\xFF\xD8\xFF': ('jpg', 'image/jpeg'),
-            b'\x89PNG\r\n\x1a\n': ('png', 'image/png'),
-            b'GIF87a': ('gif', 'image/gif'),
-            b'GIF89a': ('gif', 'image/gif'),
-            b'RIFF': ('webp', 'image/webp'),  # Also used by AVI, but less common in blockchain
-            b'BM': ('bmp', 'image/bmp'),
-            b'\x49\x49\x2A\x00': ('tiff', 'image/tiff'),  # Little-endian TIFF
-            b'\x4D\x4D\x00\x2A': ('tiff', 'image/tiff'),  # Big-endian TIFF
-            b'\x00\x00\x01\x00': ('ico', 'image/x-icon'),
-            
-            # Documents
-            b'%PDF': ('pdf', 'application/pdf'),
-            b'\xD0\xCF\x11\xE0': ('doc', 'application/msword'),  # Old DOC format
-            b'PK\x03\x04': ('zip', 'application/zip'),  # Could also be DOCX/XLSX/JAR/APK
-            
-            # Archives
-            b'\x37\x7A\xBC\xAF\x27\x1C': ('7z', 'application/x-7z-compressed'),
-            b'Rar!\x1A\x07\x00': ('rar', 'application/x-rar-compressed'),  # RAR 1.5+
-            b'Rar!\x1A\x07\x01\x00': ('rar', 'application/x-rar-compressed'),  # RAR 5.0+
-            b'\x1F\x8B': ('gz', 'application/gzip'),
-            b'BZh': ('bz2', 'application/x-bzip2'),
-            b'\x75\x73\x74\x61\x72': ('tar', 'application/x-tar'),  # At offset 257, but checking here
-            
-            # Audio
-            b'ID3': ('mp3', 'audio/mpeg'),
-            b'\xFF\xFB': ('mp3', 'audio/mpeg'),  # MP3 without ID3
-            b'\xFF\xF3': ('mp3', 'audio/mpeg'),  # MP3 without ID3
-            b'fLaC': ('flac', 'audio/flac'),
-            b'OggS': ('ogg', 'audio/ogg'),
-            
-            # Video
-            b'\x00\x00\x00\x18ftypmp42': ('mp4', 'video/mp4'),
-            b'\x00\x00\x00\x20ftypmp42': ('mp4', 'video/mp4'),
-            b'\x00\x00\x00\x18ftypisom': ('mp4', 'video/mp4'),
-            b'\x00\x00\x00\x20ftypisom': ('mp4', 'video/mp4'),
-            b'RIFF': ('avi', 'video/x-msvideo'),  # Must check for AVI list later
-            
-            # Executables
-            b'MZ': ('exe', 'application/x-msdownload'),  # Windows PE
-            b'\x7FELF': ('elf', 'application/x-executable'),  # Linux ELF
-            
-            # Other
-            b'{': ('json', 'application/json'),  # Simple JSON detection
-            b'<?xml': ('xml', 'application/xml'),
-        }
+        # Shared automaton built at import (None without pyahocorasick)
+        self.pool_automaton = POOL_AUTOMATON
         
-        if not self.btc_service.is_available:
+        if use_rpc and not self.btc_service.is_available:
             raise Exception("Bitcoin Core RPC not available")
     
     def __del__(self):
@@ -150,7 +630,18 @@ class OPReturnScanner:
         if not self.use_database:
             return False
         
-        return self.db.query(OPReturnScan).filter_by(block_number=block_number).first() is not None
+        # Only the id is needed - don't load the whole row (coinbase text included)
+        return self.db.query(OPReturnScan.id).filter_by(block_number=block_number).first() is not None
+    
+    def get_scanned_blocks(self, start_block, end_block):
+        """Get the set of block numbers in a range that have already been scanned (one query)"""
+        if not self.use_database:
+            return set()
+        
+        rows = self.db.query(OPReturnScan.block_number).filter(
+            OPReturnScan.block_number.between(start_block, end_block)
+        )
+        return {block_number for (block_number,) in rows}
     
     def extract_mining_pool(self, coinbase_tx):
         """Extract mining pool information from coinbase transaction"""
@@ -168,43 +659,24 @@ class OPReturnScanner:
             # Decode the coinbase hex
             coinbase_hex = coinbase_input['coinbase']
             try:
-                coinbase_bytes = bytes.fromhex(coinbase_hex)
-                # Try to decode as ASCII, ignore errors
-                coinbase_text = coinbase_bytes.decode('ascii', errors='ignore')
+                coinbase_bytes = binascii.unhexlify(coinbase_hex)
+                # Keep the ASCII bytes only - lowercase them in the same C pass for the pool search
+                coinbase_text = coinbase_bytes.translate(None, NON_ASCII_BYTES).decode('ascii')
+                coinbase_lower = coinbase_bytes.translate(ASCII_LOWER_TABLE, NON_ASCII_BYTES).decode('ascii')
             except:
                 coinbase_text = coinbase_hex
-            
-            # Common mining pool signatures
-            pool_signatures = {
-                'ViaBTC': 'ViaBTC',
-                'F2Pool': 'F2Pool',
-                'AntPool': 'AntPool',
-                'Foundry': 'Foundry USA',
-                'foundry': 'Foundry USA',
-                'Binance': 'Binance Pool',
-                'BTC.com': 'BTC.com',
-                'Poolin': 'Poolin',
-                'SlushPool': 'Slush Pool',
-                'MARA': 'Marathon Digital',
-                'marathon': 'Marathon Digital',
-                'SpiderPool': 'SpiderPool',
-                'SBI': 'SBI Crypto',
-                'EMCD': 'EMCD',
-                'Luxor': 'Luxor',
-                'BraiinsPool': 'Braiins Pool',
-                'stratum': 'Braiins Pool',
-                'ckpool': 'CKPool',
-                '/luckyPool/': 'luckyPool',
-                'luckyPool': 'luckyPool',
-                'ultimus': 'Ultimus Pool',
-                'SecPool': 'SecPool',
-            }
+                coinbase_lower = coinbase_hex.lower()
             
             # Search for pool signature in coinbase text
-            coinbase_lower = coinbase_text.lower()
-            for signature, pool_name in pool_signatures.items():
-                if signature.lower() in coinbase_lower:
-                    return pool_name, coinbase_text
+            if self.pool_automaton is not None:
+                # Single pass over the coinbase - keep the highest priority match
+                matches = [value for _, value in self.pool_automaton.iter(coinbase_lower)]
+                if matches:
+                    return min(matches)[1], coinbase_text
+            else:
+                for signature_lower, pool_name in POOL_SIGNATURES_LOWER:
+                    if signature_lower in coinbase_lower:
+                        return pool_name, coinbase_text
             
             # If no known pool found, return unknown with coinbase text
             return 'Unknown', coinbase_text
@@ -215,64 +687,23 @@ class OPReturnScanner:
     
     def detect_file_type(self, data):
         """Detect file type from binary data or data URI"""
-        import re
-        import base64
-        
-        # First check if this is a data URI (e.g., data:image/png;base64,...)
-        try:
-            decoded = data.decode('utf-8', errors='ignore')
-            data_uri_pattern = r'^data:(image|video|audio|application)/([a-zA-Z0-9\-\+\.]+);base64,(.+)$'
-            match = re.match(data_uri_pattern, decoded.strip())
-            if match:
-                mime_category = match.group(1)
-                mime_subtype = match.group(2)
-                base64_data = match.group(3)
-                
-                # Map common MIME types to extensions
-                mime_to_ext = {
-                    'image/png': 'png',
-                    'image/jpeg': 'jpg',
-                    'image/jpg': 'jpg',
-                    'image/gif': 'gif',
-                    'image/webp': 'webp',
-                    'image/bmp': 'bmp',
-                    'image/svg+xml': 'svg',
-                    'video/mp4': 'mp4',
-                    'video/webm': 'webm',
-                    'audio/mpeg': 'mp3',
-                    'audio/mp3': 'mp3',
-                    'audio/ogg': 'ogg',
-                    'audio/wav': 'wav',
-                    'application/pdf': 'pdf',
-                    'application/json': 'json',
-                }
-                
-                full_mime = f'{mime_category}/{mime_subtype}'
-                ext = mime_to_ext.get(full_mime, mime_subtype)
-                
-                # Return the extension, mime type, and decoded binary data
-                try:
-                    decoded_binary = base64.b64decode(base64_data)
-                    return ext, full_mime, decoded_binary
-                except:
-                    # If base64 decode fails, return the info but no decoded data
-                    return ext, full_mime, None
-        except:
-            pass
-        
-        # Not a data URI, check file signatures
-        for signature, (ext, mime) in self.file_signatures.items():
-            if data.startswith(signature):
-                return ext, mime, None
-        return None, None, None
+        return detect_file_type(data)
     
     def is_text(self, data):
         """Check if data is likely text"""
         try:
             # Try to decode as UTF-8
             decoded = data.decode('utf-8')
-            # Check if it's printable
-            printable_ratio = sum(c.isprintable() or c.isspace() for c in decoded) / len(decoded)
+            # Check if it's printable - ASCII characters are counted at C speed on the raw bytes
+            # (UTF-8 multi-byte sequences are all >= 0x80, so they never count as TEXT_BYTES)
+            printable_count = len(data) - len(data.translate(None, TEXT_BYTES))
+            if not decoded.isascii():
+                non_ascii = decoded.translate(ASCII_DELETE_MAP)
+                if non_ascii.isprintable():
+                    printable_count += len(non_ascii)
+                else:
+                    printable_count += sum(c.isprintable() or c.isspace() for c in non_ascii)
+            printable_ratio = printable_count / len(decoded)
             return printable_ratio > 0.8, decoded
         except:
             return False, None
@@ -285,21 +716,16 @@ class OPReturnScanner:
         """
         try:
             # Get transaction size (vsize for SegWit, size for legacy)
-            tx_size = tx.get('vsize', tx.get('size', 0))
-            input_count = len(tx.get('vin', []))
-            output_count = len(tx.get('vout', []))
+            # (the 'size' lookup only runs when there's no vsize)
+            tx_size = tx.get('vsize') or tx.get('size', 0)
+            input_count = len(tx.get('vin', ()))
+            output_count = len(tx.get('vout', ()))
             
-            # Calculate total output value
-            total_out = 0
-            for vout in tx.get('vout', []):
-                total_out += int(vout.get('value', 0) * 100000000)  # Convert BTC to sats
-            
-            # For block verbosity 2, we should have 'fee' field directly
-            # (available in Bitcoin Core since the inputs are resolved)
-            tx_fee = 0
-            if 'fee' in tx:
-                # Fee is negative in BTC, convert to positive satoshis
-                tx_fee = int(abs(tx.get('fee', 0)) * 100000000)
+            # Verbosity 2 transactions have the 'fee' field directly (getrawtransaction from Bitcoin Core 25.0,
+            # fetch_transactions fills it in from getblock verbosity 2 on older nodes)
+            fee = tx.get('fee')
+            # Fee is in BTC, convert to positive satoshis - rounded since the float may be just below the exact value
+            tx_fee = round(abs(fee) * 100000000) if fee is not None else 0
             
             return tx_fee, tx_size, input_count, output_count
             
@@ -308,37 +734,39 @@ class OPReturnScanner:
             return 0, 0, 0, 0
     
     def extract_op_return_from_script(self, script_hex):
-        """Extract OP_RETURN data from script hex"""
+        """Extract OP_RETURN data from script hex
+        
+        Works on the hex string directly (2 hex chars per byte) so only the payload gets decoded.
+        binascii.unhexlify is used over bytes.fromhex since it skips the whitespace handling.
+        """
         try:
-            script_bytes = bytes.fromhex(script_hex)
-            
             # OP_RETURN is 0x6a
-            if script_bytes[0] != 0x6a:
+            if not script_hex.startswith('6a'):
                 return None
             
             # Next byte(s) indicate the length
-            if len(script_bytes) < 2:
+            if len(script_hex) < 4:
                 return None
             
             # Handle different push opcodes
-            pos = 1
-            if script_bytes[pos] <= 0x4b:  # Direct length (1-75 bytes)
-                length = script_bytes[pos]
-                pos += 1
-            elif script_bytes[pos] == 0x4c:  # OP_PUSHDATA1
-                length = script_bytes[pos + 1]
-                pos += 2
-            elif script_bytes[pos] == 0x4d:  # OP_PUSHDATA2
-                length = int.from_bytes(script_bytes[pos+1:pos+3], 'little')
-                pos += 3
-            elif script_bytes[pos] == 0x4e:  # OP_PUSHDATA4
-                length = int.from_bytes(script_bytes[pos+1:pos+5], 'little')
-                pos += 5
+            push_op = int(script_hex[2:4], 16)
+            if push_op <= 0x4b:  # Direct length (1-75 bytes)
+                length = push_op
+                pos = 4
+            elif push_op == 0x4c:  # OP_PUSHDATA1
+                length = int(script_hex[4:6], 16)
+                pos = 6
+            elif push_op == 0x4d:  # OP_PUSHDATA2
+                length = struct.unpack('<H', binascii.unhexlify(script_hex[4:8]))[0]
+                pos = 8
+            elif push_op == 0x4e:  # OP_PUSHDATA4
+                length = struct.unpack('<I', binascii.unhexlify(script_hex[4:12]))[0]
+                pos = 12
             else:
                 return None
             
             # Extract the data
-            data = script_bytes[pos:pos+length]
+            data = binascii.unhexlify(script_hex[pos:pos + length * 2])
             return data
             
         except Exception as e:
@@ -353,47 +781,53 @@ class OPReturnScanner:
         # If we got decoded binary data from a data URI, use that for saving
         save_data = decoded_binary if decoded_binary is not None else data
         
-        is_text_data, decoded_text = self.is_text(data)
+        # Payloads with a binary file signature can't be text - skip the decode
+        if file_ext is None or file_ext in TEXT_FILE_TYPES or decoded_binary is not None:
+            is_text_data, decoded_text = self.is_text(data)
+        else:
+            is_text_data, decoded_text = False, None
         
-        # Convert to hex for database storage
-        data_hex = data.hex()
+        # Undetected payloads are stored as generic text or binary
+        if file_ext:
+            stored_file_type, stored_mime_type = file_ext, mime_type
+        else:
+            stored_file_type, stored_mime_type = TEXT_TYPE if is_text_data else BINARY_TYPE
         
         # Calculate fee rate and cost per byte
+        data_size = len(data)
         fee_rate = (tx_fee / tx_size) if tx_size > 0 else 0
-        cost_per_byte = (tx_fee / len(data)) if len(data) > 0 else 0
+        cost_per_byte = (tx_fee / data_size) if data_size > 0 else 0
         
-        # Check if data is too large for TEXT column (65535 bytes = 32767 bytes raw)
+        # Keep database rows small (decoded_text is a TEXT column too)
         # Store NULL in database for very large files, rely on filesystem
-        store_raw_data = len(data) <= 32767
+        store_raw_data = data_size <= 32767
         if not store_raw_data:
-            logger.info(f"  💾 Large file ({len(data):,} bytes) - storing metadata only, data on disk")
+            logger.info(f"  💾 Large file ({data_size:,} bytes) - storing metadata only, data on disk")
         
-        # Save to database
+        # Stage the row in the database session - scan_block commits once per block
         if self.use_database and scan_record:
-            try:
-                large_op_return = LargeOPReturn(
-                    scan_id=scan_record.id,
-                    block_number=block_number,
-                    txid=txid,
-                    vout_index=vout_index,
-                    data_size=len(data),
-                    raw_data=data_hex if store_raw_data else None,  # NULL for large files
-                    decoded_text=decoded_text if store_raw_data and decoded_text else None,
-                    file_type=file_ext or ("text" if is_text_data else "binary"),
-                    mime_type=mime_type or ("text/plain" if is_text_data else "application/octet-stream"),
-                    is_text=is_text_data,
-                    tx_fee=tx_fee if tx_fee > 0 else None,
-                    tx_size=tx_size if tx_size > 0 else None,
-                    fee_rate=fee_rate if fee_rate > 0 else None,
-                    cost_per_byte=cost_per_byte if cost_per_byte > 0 else None,
-                    tx_input_count=input_count if input_count > 0 else None,
-                    tx_output_count=output_count if output_count > 0 else None
-                )
-                self.db.add(large_op_return)
-                self.db.commit()
-            except Exception as e:
-                logger.error(f"  ❌ Error saving to database: {e}")
-                self.db.rollback()
+            large_op_return = LargeOPReturn(
+                scan=scan_record,
+                block_number=block_number,
+                txid=txid,
+                vout_index=vout_index,
+                data_size=data_size,
+                raw_bytes=data if store_raw_data else None,  # NULL for large files
+                decoded_text=decoded_text if store_raw_data and decoded_text else None,
+                file_type=stored_file_type,
+                mime_type=stored_mime_type,
+                is_text=is_text_data,
+                tx_fee=tx_fee if tx_fee > 0 else None,
+                tx_size=tx_size if tx_size > 0 else None,
+                fee_rate=fee_rate if fee_rate > 0 else None,
+                cost_per_byte=cost_per_byte if cost_per_byte > 0 else None,
+                tx_input_count=input_count if input_count > 0 else None,
+                tx_output_count=output_count if output_count > 0 else None
+            )
+            self.db.add(large_op_return)
+        
+        # Check if this is a dangerous executable type
+        is_dangerous = file_ext in DANGEROUS_TYPES
         
         # Save to files
         # Create directory for this block
@@ -410,10 +844,12 @@ class OPReturnScanner:
             "mined_by": mined_by or "Unknown",
             "transaction_id": txid,
             "vout_index": vout_index,
-            "data_size": len(data),
-            "file_type": file_ext or ("text" if is_text_data else "binary"),
-            "mime_type": mime_type or ("text/plain" if is_text_data else "application/octet-stream"),
-            "raw_data_hex": data.hex(),
+            "data_size": data_size,
+            "file_type": stored_file_type,
+            "mime_type": stored_mime_type,
+            # Large payloads are already on disk as _raw.bin - only keep their hex when it's the sole copy
+            # (executables aren't written to disk and data URIs are written decoded)
+            "raw_data_hex": data.hex() if store_raw_data or is_dangerous or decoded_binary is not None else None,
             "transaction_fee_sats": tx_fee if tx_fee > 0 else None,
             "transaction_size_vbytes": tx_size if tx_size > 0 else None,
             "fee_rate_sats_per_vbyte": round(fee_rate, 2) if fee_rate > 0 else None,
@@ -423,22 +859,15 @@ class OPReturnScanner:
         }
         
         # Save metadata JSON (always - contains hex data for analysis)
-        with open(block_dir / f"{base_name}_metadata.json", 'w', newline='\n') as f:
-            json.dump(metadata, f, indent=2)
-        
-        # Check if this is a dangerous executable type
-        dangerous_types = {'exe', 'elf'}
-        is_dangerous = file_ext in dangerous_types
+        self.submit_write(write_json_file, block_dir / f"{base_name}_metadata.json", metadata)
         
         # Save raw data (skip for executables - security risk)
         if not is_dangerous:
-            with open(block_dir / f"{base_name}_raw.bin", 'wb') as f:
-                f.write(save_data)
+            self.submit_write((block_dir / f"{base_name}_raw.bin").write_bytes, save_data)
         
         # Save decoded text if applicable
         if is_text_data:
-            with open(block_dir / f"{base_name}_decoded.txt", 'w', encoding='utf-8') as f:
-                f.write(decoded_text)
+            self.submit_write((block_dir / f"{base_name}_decoded.txt").write_text, decoded_text, encoding='utf-8')
             logger.info(f"  💬 Text data: {decoded_text[:100]}...")
         
         # Save as file if file type detected (skip executables)
@@ -448,8 +877,7 @@ class OPReturnScanner:
                 logger.info(f"     Only metadata JSON saved (hex data preserved for analysis)")
             else:
                 file_path = block_dir / f"{base_name}.{file_ext}"
-                with open(file_path, 'wb') as f:
-                    f.write(save_data)
+                self.submit_write(file_path.write_bytes, save_data)
                 logger.info(f"  📄 File saved: {file_path.name} ({mime_type})")
                 # If this was a data URI, note that we decoded it
                 if decoded_binary is not None:
@@ -457,20 +885,188 @@ class OPReturnScanner:
         
         return metadata
     
-    def scan_block(self, block_number, skip_if_scanned=True):
-        """Scan a single block for OP_RETURN transactions"""
+    def fetch_blocks(self, block_numbers):
+        """Fetch several blocks with batched RPC calls
+        
+        Returns a list of (block_number, block_hash, block) - block_hash/block are None
+        for any block that couldn't be fetched.
+        """
+        try:
+            block_hashes = self.btc_service._call_rpc_batch(
+                [("getblockhash", [block_number]) for block_number in block_numbers]
+            )
+            fetched_hashes = [block_hash for block_hash in block_hashes if block_hash]
+            # Raw blocks (verbosity 0) are parsed locally - far less for the node to serialize than verbosity 2
+            raw_blocks = self.btc_service._call_rpc_batch(
+                [("getblock", [block_hash, 0]) for block_hash in fetched_hashes],
+                timeout=120
+            )
+            blocks = iter([parse_raw_block(binascii.unhexlify(raw_block)) for raw_block in raw_blocks])
+        except Exception as e:
+            logger.warning(f"Batched block fetch failed, falling back to single requests: {e}")
+            return [(block_number, None, None) for block_number in block_numbers]
+        
+        return [
+            (block_number, block_hash, next(blocks) if block_hash else None)
+            for block_number, block_hash in zip(block_numbers, block_hashes)
+        ]
+    
+    def fetch_transactions(self, tx_refs):
+        """Fetch several transactions with one batched RPC call
+        
+        tx_refs is a list of (txid, block_hash). Returns the decoded transactions (verbosity 2, which
+        includes the fee) in the same order, with None for any that couldn't be fetched.
+        Passing the block hash lets the node find the transaction without txindex.
+        """
+        try:
+            txs = self.btc_service._call_rpc_batch(
+                [("getrawtransaction", [txid, 2, block_hash]) for txid, block_hash in tx_refs],
+                timeout=120
+            )
+        except Exception as e:
+            # Some RPC providers reject batches - fall back to one request per transaction
+            logger.warning(f"Batched transaction fetch failed, falling back to single requests: {e}")
+            txs = []
+            for txid, block_hash in tx_refs:
+                try:
+                    txs.append(self.btc_service._call_rpc("getrawtransaction", [txid, 2, block_hash], timeout=120))
+                except Exception as e:
+                    logger.debug(f"Error fetching transaction {txid}: {e}")
+                    txs.append(None)
+        
+        return self.fill_missing_fees(tx_refs, txs)
+    
+    def fill_missing_fees(self, tx_refs, txs):
+        """Take fees from getblock verbosity 2 for transactions returned without one
+        
+        getrawtransaction only includes the fee at verbosity 2 from Bitcoin Core 25.0 - older nodes
+        answer as verbosity 1. Those blocks are fetched with getblock verbosity 2 instead (which has
+        fees on older nodes too), one block at a time, keeping only the transactions needed.
+        """
+        missing = {}  # block_hash -> {txid: index in txs}
+        for idx, ((txid, block_hash), tx) in enumerate(zip(tx_refs, txs)):
+            # Coinbase transactions have no fee to look up
+            if tx is not None and 'fee' not in tx and 'coinbase' not in tx['vin'][0]:
+                missing.setdefault(block_hash, {})[txid] = idx
+        
+        if not missing:
+            return txs
+        
+        if not self.fee_fallback_warned:
+            self.fee_fallback_warned = True
+            logger.warning("⚠️  Node returned transactions without fees (getrawtransaction verbosity 2 needs "
+                           "Bitcoin Core 25.0+) - falling back to getblock verbosity 2, which is much slower")
+        
+        for block_hash, wanted in missing.items():
+            try:
+                block = self.btc_service._call_rpc("getblock", [block_hash, 2], timeout=300)
+            except Exception as e:
+                logger.warning(f"Error fetching block {block_hash} for transaction fees: {e}")
+                continue
+            for tx in block['tx']:
+                idx = wanted.get(tx['txid'])
+                if idx is not None:
+                    txs[idx] = tx
+        
+        return txs
+    
+    def submit_write(self, write, *args, **kwargs):
+        """Run a file write on the background writer when one is active, otherwise right away"""
+        if self.io_pool is None:
+            write(*args, **kwargs)
+        else:
+            self.pending_writes.append(self.io_pool.submit(write, *args, **kwargs))
+    
+    def wait_for_writes(self):
+        """Wait for the background file writes queued so far - failures are logged"""
+        for future in self.pending_writes:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error writing OP_RETURN file: {e}")
+        self.pending_writes.clear()
+    
+    def prefetch_blocks(self, start_block, end_block):
+        """Yield (block_number, block_hash, block) for unscanned blocks in order
+        
+        Batches are fetched ahead in a thread pool so RPC I/O overlaps with block processing.
+        Database access stays on the calling thread.
+        """
+        total_blocks = end_block - start_block + 1
+        scanned_blocks = self.get_scanned_blocks(start_block, end_block)
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            for batch_start in range(start_block, end_block + 1, self.batch_size):
+                batch = range(batch_start, min(batch_start + self.batch_size, end_block + 1))
+                
+                # Only fetch blocks that still need scanning
+                to_fetch = []
+                for block_num in batch:
+                    if block_num % 100 == 0 or block_num == start_block:
+                        progress = ((block_num - start_block) / total_blocks) * 100
+                        logger.info(f"📈 Progress: {progress:.1f}% (Block {block_num}/{end_block})")
+                    
+                    if block_num in scanned_blocks:
+                        logger.info(f"⏭️  Block {block_num} already scanned, skipping")
+                    else:
+                        to_fetch.append(block_num)
+                
+                # Ranges that were already scanned don't need a trip through the pool
+                if not to_fetch:
+                    continue
+                pending.append(executor.submit(self.fetch_blocks, to_fetch))
+                
+                # Keep up to fetch_workers batches in flight ahead of the one being processed
+                if len(pending) > self.fetch_workers:
+                    yield from pending.popleft().result()
+            
+            while pending:
+                yield from pending.popleft().result()
+    
+    def prefetch_transactions(self, batches):
+        """Yield (batch, txs) for batches of re-scan rows in order
+        
+        Like prefetch_blocks, only fetch_workers batches are fetched ahead of the one being
+        processed, so the whole re-scan set is never held in memory at once.
+        """
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            for batch in batches:
+                tx_refs = [(op_return.txid, op_return.block_hash) for op_return in batch]
+                pending.append((batch, executor.submit(self.fetch_transactions, tx_refs)))
+                
+                # Keep up to fetch_workers batches in flight ahead of the one being processed
+                if len(pending) > self.fetch_workers:
+                    done_batch, future = pending.popleft()
+                    yield done_batch, future.result()
+            
+            while pending:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+    
+    def scan_block(self, block_number, skip_if_scanned=True, block_hash=None, block=None, commit=True):
+        """Scan a single block for OP_RETURN transactions
+        
+        block_hash and block can be passed in when the block was already fetched (see fetch_blocks).
+        With commit=False the block is written under a savepoint and committed later by the caller.
+        Returns (found_count, found_items) - found_items has a summary dict per OP_RETURN found.
+        """
         # Check if already scanned
         if skip_if_scanned and self.block_already_scanned(block_number):
             logger.info(f"⏭️  Block {block_number} already scanned, skipping")
-            return 0
+            return 0, []
         
+        savepoint = None
         try:
-            block_hash = self.btc_service._call_rpc("getblockhash", [block_number])
-            block = self.btc_service._call_rpc("getblock", [block_hash, 2])  # Verbosity 2 for full tx data
+            if block is None:
+                block_hash = self.btc_service._call_rpc("getblockhash", [block_number])
+                block = parse_raw_block(binascii.unhexlify(self.btc_service._call_rpc("getblock", [block_hash, 0])))
             
             block_time = datetime.fromtimestamp(block['time'])
-            total_tx_count = len(block['tx'])
-            found_count = 0
+            total_tx_count = block['nTx']
+            found_items = []
             
             # Extract mining pool from coinbase transaction (first tx)
             mined_by = None
@@ -481,80 +1077,104 @@ class OPReturnScanner:
                 if mined_by:
                     logger.info(f"⛏️  Block mined by: {mined_by}")
             
-            # Create scan record
+            # Collect OP_RETURN outputs first so the per-vout hot path is just a prefix check
+            op_return_outputs = find_op_return_outputs(block['tx'])
+            
+            large_op_returns = []
+            for tx, vout_idx, script_hex in op_return_outputs:
+                data = self.extract_op_return_from_script(script_hex)
+                if data and len(data) > 83:
+                    large_op_returns.append((tx, vout_idx, data))
+            
+            # Parsed raw blocks have no fees - fetch just the transactions with a large OP_RETURN in one batch
+            fee_txids = list(dict.fromkeys(tx['txid'] for tx, _, _ in large_op_returns if 'fee' not in tx))
+            full_txs = {}
+            if fee_txids:
+                fetched = self.fetch_transactions([(txid, block_hash) for txid in fee_txids])
+                full_txs = {txid: full_tx for txid, full_tx in zip(fee_txids, fetched) if full_tx}
+            
+            # Create the scan record with its final count - the block's rows are inserted together on commit
+            found_count = len(large_op_returns)
             scan_record = None
             if self.use_database:
+                if not commit:
+                    savepoint = self.db.begin_nested()
                 scan_record = OPReturnScan(
                     block_number=block_number,
                     block_hash=block_hash,
                     block_time=block_time,
                     total_transactions=total_tx_count,
-                    large_op_returns_found=0,  # Will update this later
+                    large_op_returns_found=found_count,
                     mined_by=mined_by,
                     coinbase_text=coinbase_text
                 )
                 self.db.add(scan_record)
-                self.db.commit()
             
-            # Check each transaction
-            for tx in block['tx']:
+            tx_fees = {}
+            for tx, vout_idx, data in large_op_returns:
                 txid = tx['txid']
+                if txid not in tx_fees:
+                    tx_fees[txid] = self.calculate_transaction_fee(full_txs.get(txid, tx))
+                tx_fee, tx_size, input_count, output_count = tx_fees[txid]
                 
-                # Calculate transaction fee information once per transaction
-                tx_fee, tx_size, input_count, output_count = self.calculate_transaction_fee(tx)
+                logger.info(f"📦 Found OP_RETURN in block {block_number}, tx {txid}, vout {vout_idx}")
+                data_size = len(data)
+                logger.info(f"  Size: {data_size} bytes")
                 
-                # Check each output
-                for vout_idx, vout in enumerate(tx['vout']):
-                    script_hex = vout['scriptPubKey'].get('hex', '')
-                    
-                    # Check if it's OP_RETURN
-                    if script_hex.startswith('6a'):  # OP_RETURN opcode
-                        data = self.extract_op_return_from_script(script_hex)
-                        
-                        if data and len(data) > 83:
-                            found_count += 1
-                            logger.info(f"📦 Found OP_RETURN in block {block_number}, tx {txid}, vout {vout_idx}")
-                            logger.info(f"  Size: {len(data)} bytes")
-                            
-                            # Log fee information if available
-                            if tx_fee > 0:
-                                fee_rate = tx_fee / tx_size if tx_size > 0 else 0
-                                cost_per_byte = tx_fee / len(data) if len(data) > 0 else 0
-                                logger.info(f"  Fee: {tx_fee:,} sats ({fee_rate:.2f} sats/vbyte)")
-                                logger.info(f"  Cost: {cost_per_byte:.2f} sats/byte of OP_RETURN data")
-                            
-                            self.save_op_return_data(
-                                scan_record,
-                                block_number,
-                                block_time,
-                                txid,
-                                vout_idx,
-                                data,
-                                mined_by,
-                                tx_fee,
-                                tx_size,
-                                input_count,
-                                output_count
-                            )
+                # Log fee information if available (payloads here are always > 83 bytes)
+                if tx_fee > 0:
+                    fee_rate = tx_fee / tx_size if tx_size > 0 else 0
+                    cost_per_byte = tx_fee / data_size
+                    logger.info(f"  Fee: {tx_fee:,} sats ({fee_rate:.2f} sats/vbyte)")
+                    logger.info(f"  Cost: {cost_per_byte:.2f} sats/byte of OP_RETURN data")
+                
+                metadata = self.save_op_return_data(
+                    scan_record,
+                    block_number,
+                    block_time,
+                    txid,
+                    vout_idx,
+                    data,
+                    mined_by,
+                    tx_fee,
+                    tx_size,
+                    input_count,
+                    output_count
+                )
+                found_items.append({
+                    'block': block_number,
+                    'mined_by': metadata['mined_by'],
+                    'txid': txid,
+                    'size': metadata['data_size'],
+                    'type': metadata['file_type']
+                    })
             
-            # Update scan record with found count
+            # Commit the whole block at once
             if self.use_database and scan_record:
-                scan_record.large_op_returns_found = found_count
-                self.db.commit()
+                if savepoint is not None:
+                    savepoint.commit()
+                else:
+                    self.db.commit()
             
-            return found_count
+            return found_count, found_items
             
         except Exception as e:
             logger.error(f"Error scanning block {block_number}: {e}")
-            if self.use_database:
+            if savepoint is not None:
+                # Only this block is rolled back - earlier uncommitted blocks are kept
+                savepoint.rollback()
+            elif self.use_database and commit:
                 self.db.rollback()
-            return 0
+            return 0, []
     
     def scan_blocks(self, start_block, end_block=None, auto_continue=False, backwards=False):
         """Scan a range of blocks"""
+        # One aggregate query up front - it has the first/last scanned blocks as well
+        stats = self.get_scan_statistics() if self.use_database else None
+        
         # Handle backwards mode (scan backwards in time from first scanned block)
         if backwards:
-            first_scanned = self.get_first_scanned_block()
+            first_scanned = stats['first_block'] if stats else None
             if first_scanned:
                 # Scan one month backwards (~4320 blocks = 30 days * 144 blocks/day)
                 end_block = first_scanned - 1
@@ -566,7 +1186,7 @@ class OPReturnScanner:
                 return 0
         # Handle auto-continue mode
         elif auto_continue:
-            last_scanned = self.get_last_scanned_block()
+            last_scanned = stats['last_block'] if stats else None
             if last_scanned:
                 start_block = last_scanned + 1
                 logger.info(f"📍 Auto-continue from last scanned block: {last_scanned}")
@@ -580,7 +1200,6 @@ class OPReturnScanner:
         
         # Show current stats if database is enabled
         if self.use_database:
-            stats = self.get_scan_statistics()
             if stats['total_blocks_scanned'] > 0:
                 logger.info(f"📊 Previous statistics:")
                 logger.info(f"   Blocks scanned: {stats['total_blocks_scanned']}")
@@ -597,28 +1216,28 @@ class OPReturnScanner:
         total_blocks = end_block - start_block + 1
         found_items = []  # Track all found OP_RETURNs for summary
         
-        for block_num in range(start_block, end_block + 1):
-            if block_num % 100 == 0 or block_num == start_block:
-                progress = ((block_num - start_block) / total_blocks) * 100
-                logger.info(f"📈 Progress: {progress:.1f}% (Block {block_num}/{end_block})")
-            
-            found = self.scan_block(block_num)
-            total_found += found
-            
-            # If OP_RETURNs were found, get their details
-            if found > 0 and self.use_database:
-                scan_record = self.db.query(OPReturnScan).filter(
-                    OPReturnScan.block_number == block_num
-                ).first()
-                if scan_record:
-                    for op_return in scan_record.op_returns:
-                        found_items.append({
-                            'block': block_num,
-                            'mined_by': scan_record.mined_by or "Unknown",
-                            'txid': op_return.txid,
-                            'size': op_return.data_size,
-                            'type': op_return.file_type
-                        })
+        # Files are written in background threads while the next blocks are processed
+        self.io_pool = ThreadPoolExecutor(max_workers=SCAN_IO_WORKERS)
+        try:
+            for scanned, (block_num, block_hash, block) in enumerate(self.prefetch_blocks(start_block, end_block), 1):
+                found, items = self.scan_block(block_num, skip_if_scanned=False, block_hash=block_hash, block=block,
+                                               commit=False)
+                total_found += found
+                found_items.extend(items)
+                
+                # Commit every few blocks rather than after each one - after their files so the
+                # database never gets ahead of the disk
+                if scanned % SCAN_COMMIT_BLOCKS == 0:
+                    self.wait_for_writes()
+                    if self.use_database:
+                        self.db.commit()
+        finally:
+            self.wait_for_writes()
+            self.io_pool.shutdown()
+            self.io_pool = None
+        
+        if self.use_database:
+            self.db.commit()
         
         logger.info(f"\n✅ Scan complete!")
         logger.info(f"   Scanned {total_blocks} blocks")
@@ -655,27 +1274,34 @@ class OPReturnScanner:
         return total_found
     
     def rescan_large_op_returns(self):
-        """Re-scan all blocks that have large OP_RETURNs to update with new features (like fee tracking)"""
+        """Re-fetch the transactions of all large OP_RETURNs to update them with new features (like fee tracking)
+        
+        Only the hit transactions are fetched (getrawtransaction with the block hash), in batches,
+        and the existing rows are updated in place instead of re-scanning whole blocks.
+        """
         if not self.use_database:
             logger.error("Re-scanning requires database to be enabled")
             return 0
         
-        # Get all blocks that have large OP_RETURNs
-        blocks_with_ops = self.db.query(OPReturnScan).filter(
-            OPReturnScan.large_op_returns_found > 0
-        ).order_by(OPReturnScan.block_number).all()
+        # Get all large OP_RETURNs along with the hash of the block they're in
+        # (only the columns needed here - raw_bytes/decoded_text can be large)
+        op_returns = self.db.execute(text(
+            "SELECT l.id, l.txid, l.data_size, s.block_hash "
+            "FROM large_op_returns l JOIN op_return_scans s ON s.id = l.scan_id "
+            "ORDER BY l.block_number"
+        )).fetchall()
         
-        if not blocks_with_ops:
+        if not op_returns:
             logger.info("No blocks with large OP_RETURNs found to re-scan")
             return 0
         
-        total_blocks = len(blocks_with_ops)
-        total_ops = sum(scan.large_op_returns_found for scan in blocks_with_ops)
+        total_ops = len(op_returns)
+        total_blocks = self.db.query(func.count(func.distinct(LargeOPReturn.block_number))).scalar()
         
         logger.info(f"\n🔄 Re-scanning blocks with large OP_RETURNs")
         logger.info("=" * 80)
         logger.info(f"Found {total_blocks} blocks with {total_ops} large OP_RETURNs")
-        logger.info("This will DELETE and RE-SCAN to update with latest features (e.g., fee tracking)")
+        logger.info("This will RE-FETCH their transactions and update them with latest features (e.g., fee tracking)")
         logger.info("")
         
         # Confirm with user
@@ -687,40 +1313,80 @@ class OPReturnScanner:
         logger.info("\n🚀 Starting re-scan...")
         print()
         
-        rescanned_count = 0
-        ops_found = 0
-        
-        for idx, scan in enumerate(blocks_with_ops, 1):
-            block_num = scan.block_number
+        updated_count = 0
+        chunk_updated = 0  # applied since the last commit - only counted once committed
+        fee_update = text(
+            "UPDATE large_op_returns SET tx_fee = :tx_fee, tx_size = :tx_size, fee_rate = :fee_rate, "
+            "cost_per_byte = :cost_per_byte, tx_input_count = :tx_input_count, "
+            "tx_output_count = :tx_output_count WHERE id = :id"
+        )
+        
+        batches = [op_returns[idx:idx + RESCAN_BATCH_SIZE] for idx in range(0, total_ops, RESCAN_BATCH_SIZE)]
+        
+        # Batches are fetched ahead in a thread pool, results are applied in order on this thread
+        # (the database session isn't thread-safe)
+        for batch_num, (batch, txs) in enumerate(self.prefetch_transactions(batches)):
+            idx = batch_num * RESCAN_BATCH_SIZE
             
             # Show progress
-            if idx % 10 == 0 or idx == 1:
-                progress = (idx / total_blocks) * 100
-                logger.info(f"📈 Progress: {progress:.1f}% ({idx}/{total_blocks} blocks)")
+            progress = (idx / total_ops) * 100
+            logger.info(f"📈 Progress: {progress:.1f}% ({idx}/{total_ops} OP_RETURNs)")
             
             try:
-                # Delete the existing scan (cascades to LargeOPReturn records)
-                self.db.query(LargeOPReturn).filter(
-                    LargeOPReturn.scan_id == scan.id
-                ).delete()
-                self.db.query(OPReturnScan).filter(
-                    OPReturnScan.id == scan.id
-                ).delete()
-                self.db.commit()
+                updates = []
+                for op_return, tx in zip(batch, txs):
+                    if tx is None:
+                        logger.warning(f"  ⚠️  Could not fetch transaction {op_return.txid}")
+                        continue
+                    
+                    tx_fee, tx_size, input_count, output_count = self.calculate_transaction_fee(tx)
+                    fee_rate = (tx_fee / tx_size) if tx_size > 0 else 0
+                    cost_per_byte = (tx_fee / op_return.data_size) if op_return.data_size > 0 else 0
+                    
+                    updates.append({
+                        "id": op_return.id,
+                        "tx_fee": tx_fee if tx_fee > 0 else None,
+                        "tx_size": tx_size if tx_size > 0 else None,
+                        "fee_rate": fee_rate if fee_rate > 0 else None,
+                        "cost_per_byte": cost_per_byte if cost_per_byte > 0 else None,
+                        "tx_input_count": input_count if input_count > 0 else None,
+                        "tx_output_count": output_count if output_count > 0 else None
+                    })
                 
-                # Re-scan the block
-                found = self.scan_block(block_num, skip_if_scanned=False)
-                ops_found += found
-                rescanned_count += 1
+                if updates:
+                    try:
+                        # Savepoint per batch - a failing batch is rolled back without losing the others
+                        with self.db.begin_nested():
+                            self.db.execute(fee_update, updates)
+                        chunk_updated += len(updates)
+                    except Exception as e:
+                        # Retry the batch row by row so one bad row doesn't lose the rest
+                        logger.warning(f"  ⚠️  Batch update failed, retrying OP_RETURNs one at a time: {e}")
+                        for update in updates:
+                            try:
+                                with self.db.begin_nested():
+                                    self.db.execute(fee_update, update)
+                                chunk_updated += 1
+                            except Exception as e:
+                                logger.error(f"Error updating OP_RETURN {update['id']}: {e}")
                 
             except Exception as e:
-                logger.error(f"Error re-scanning block {block_num}: {e}")
-                self.db.rollback()
-                continue
+                logger.error(f"Error re-scanning OP_RETURNs {idx}-{idx + len(batch)}: {e}")
+            
+            # Commit every few batches (and after the last one) rather than after each one
+            if (batch_num + 1) % RESCAN_COMMIT_BATCHES == 0 or batch_num == len(batches) - 1:
+                try:
+                    self.db.commit()
+                    updated_count += chunk_updated
+                except Exception as e:
+                    # Drop this chunk and carry on with the next one
+                    self.db.rollback()
+                    logger.error(f"Error committing re-scan updates up to OP_RETURN {idx + len(batch)}: {e}")
+                chunk_updated = 0
         
         logger.info(f"\n✅ Re-scan complete!")
-        logger.info(f"   Re-scanned {rescanned_count} blocks")
-        logger.info(f"   Found {ops_found} OP_RETURN transactions")
+        logger.info(f"   Re-scanned {total_blocks} blocks")
+        logger.info(f"   Updated {updated_count} OP_RETURN transactions")
         
         # Show updated statistics
         stats = self.get_scan_statistics()
@@ -730,110 +1396,156 @@ class OPReturnScanner:
         logger.info(f"   Block range: {stats['first_block']} - {stats['last_block']}")
         logger.info(f"   Average per block: {stats['avg_per_block']:.2f}")
         
-        return rescanned_count
+        return updated_count
     
-    def reinterpret_file_types(self, file_type_filter='binary'):
+    def reinterpret_file_types(self, file_type_filter='binary', jobs=1):
         """Re-interpret file types for existing OP_RETURNs
         
         Args:
             file_type_filter: Only reinterpret OP_RETURNs with this file type (default: 'binary')
+            jobs: Worker processes detecting file types (default: 1, detect in this process; 0 = one per CPU)
         """
         if not self.use_database:
             logger.error("Reinterpretation requires database to be enabled")
             return 0
         
-        # Query for OP_RETURNs with the specified file type
-        op_returns = self.db.query(LargeOPReturn).filter(
+        # Count OP_RETURNs with the specified file type - the rows themselves are loaded in chunks
+        total_count = self.db.query(func.count(LargeOPReturn.id)).filter(
             LargeOPReturn.file_type == file_type_filter
-        ).all()
+        ).scalar()
         
-        if not op_returns:
+        if not total_count:
             logger.info(f"No OP_RETURNs found with file type '{file_type_filter}'")
             return 0
         
-        logger.info(f"\n🔄 Reinterpreting {len(op_returns)} OP_RETURN(s) with file type '{file_type_filter}'")
+        # Detection is pure CPU, so 0 jobs means one worker per core
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        
+        logger.info(f"\n🔄 Reinterpreting {total_count} OP_RETURN(s) with file type '{file_type_filter}'")
         logger.info("=" * 80)
         
         updated_count = 0
         unchanged_count = 0
-        
-        for op_return in op_returns:
-            try:
-                # Get the raw data
-                raw_data = bytes.fromhex(op_return.raw_data)
+        skipped_writes = 0
+        last_id = 0
+        output_dir = self.output_dir
+        block_dir_number = block_dir = None
+        # Per-row details are only logged at debug level - checked once rather than per log call
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        
+        # Files are written in background threads while the next rows are being detected,
+        # detection itself can be spread over worker processes - writes and commits stay here
+        with (Pool(jobs) if jobs > 1 else nullcontext()) as sniff_pool, \
+                ThreadPoolExecutor(max_workers=REINTERPRET_IO_WORKERS) as io_pool:
+            while True:
+                # Page by id rather than offset - plain rows, no ORM objects are needed to read these
+                op_returns = self.db.execute(text(
+                    "SELECT id, block_number, txid, vout_index, data_size, raw_bytes, file_type "
+                    "FROM large_op_returns WHERE file_type = :file_type AND id > :last_id "
+                    "ORDER BY id LIMIT :limit"
+                ), {"file_type": file_type_filter, "last_id": last_id, "limit": REINTERPRET_CHUNK_SIZE}).fetchall()
                 
-                # Detect file type again (may decode data URIs)
-                new_file_ext, new_mime_type, decoded_binary = self.detect_file_type(raw_data)
+                if not op_returns:
+                    break
+                last_id = op_returns[-1].id
+                updates = []
+                writes = []  # (future, file name, decoded from data URI) - logged once the write has finished
+                metadata_updates = []  # futures of update_metadata_types
                 
-                # Use decoded binary if available (from data URI)
-                save_data = decoded_binary if decoded_binary is not None else raw_data
+                # Detect file types again (may decode data URIs) - results come back in row order
+                payloads = [op_return.raw_bytes for op_return in op_returns]
+                if sniff_pool is not None:
+                    detections = sniff_pool.map(sniff_payload, payloads, chunksize=REINTERPRET_JOB_CHUNK_SIZE)
+                else:
+                    detections = map(sniff_payload, payloads)
                 
-                # Check if we found a more specific type
-                if new_file_ext and new_file_ext != file_type_filter:
-                    logger.info(f"\n📦 Block {op_return.block_number}, tx {op_return.txid[:16]}...")
-                    logger.info(f"   Old type: {op_return.file_type}")
-                    logger.info(f"   New type: {new_file_ext} ({new_mime_type})")
-                    logger.info(f"   Size: {op_return.data_size} bytes")
-                    
-                    # Update database
-                    op_return.file_type = new_file_ext
-                    op_return.mime_type = new_mime_type
+                for op_return, detection in zip(op_returns, detections):
+                    try:
+                        if detection is None:
+                            raise ValueError("no raw data stored in the database")
+                        new_file_ext, new_mime_type, decoded_binary = detection
+                        
+                        # Get the raw data (stored as bytes - no hex decoding needed)
+                        raw_data = bytes(op_return.raw_bytes)
                     
-                    # Get the scan record to get block info
-                    scan_record = self.db.query(OPReturnScan).filter(
-                        OPReturnScan.id == op_return.scan_id
-                    ).first()
+                        # Use decoded binary if available (from data URI)
+                        save_data = decoded_binary if decoded_binary is not None else raw_data
                     
-                    if scan_record:
-                        # Update metadata JSON file
-                        block_dir = self.output_dir / f"block_{op_return.block_number}"
-                        base_name = f"tx_{op_return.txid}_{op_return.vout_index}"
-                        metadata_file = block_dir / f"{base_name}_metadata.json"
+                        # Check if we found a more specific type
+                        if new_file_ext and new_file_ext != file_type_filter:
+                            if verbose:
+                                logger.debug(f"\n📦 Block {op_return.block_number}, tx {op_return.txid[:16]}...")
+                                logger.debug(f"   Old type: {op_return.file_type}")
+                                logger.debug(f"   New type: {new_file_ext} ({new_mime_type})")
+                                logger.debug(f"   Size: {op_return.data_size} bytes")
                         
-                        if metadata_file.exists():
-                            with open(metadata_file, 'r') as f:
-                                metadata = json.load(f)
-                            
-                            metadata['file_type'] = new_file_ext
-                            metadata['mime_type'] = new_mime_type
+                            # Queue the database update - applied for the whole chunk at once
+                            updates.append({"file_type": new_file_ext, "mime_type": new_mime_type, "id": op_return.id})
+                        
+                            # Update metadata JSON file (rows come in insertion order, so consecutive rows share a block)
+                            if op_return.block_number != block_dir_number:
+                                block_dir_number = op_return.block_number
+                                block_dir = output_dir / f"block_{block_dir_number}"
+                            base_name = f"tx_{op_return.txid}_{op_return.vout_index}"
+                            metadata_file = block_dir / f"{base_name}_metadata.json"
                             
-                            with open(metadata_file, 'w', newline='\n') as f:
-                                json.dump(metadata, f, indent=2)
+                            # Read, compare and rewrite in the background (reads wait on the disk too)
+                            metadata_updates.append(io_pool.submit(update_metadata_types, metadata_file,
+                                                                   new_file_ext, new_mime_type))
                             
-                            logger.info(f"   ✓ Updated metadata file")
+                            # Create/update the file with proper extension (skip dangerous executables)
+                            if new_file_ext not in DANGEROUS_TYPES:
+                                new_file_name = f"{base_name}.{new_file_ext}"
+                                writes.append((io_pool.submit(write_new_file, block_dir / new_file_name, save_data),
+                                               new_file_name, decoded_binary is not None))
+                            else:
+                                logger.warning(f"   ⚠️  Skipping all file creation for executable: {new_file_ext} (security risk)")
+                                # Remove any existing .bin file if it was created before security fix
+                                bin_file = block_dir / f"{base_name}_raw.bin"
+                                try:
+                                    bin_file.unlink()
+                                    logger.info(f"   ✓ Removed existing .bin file for security")
+                                except FileNotFoundError:
+                                    pass
                         
-                        # Create/update the file with proper extension (skip dangerous executables)
-                        dangerous_types = {'exe', 'elf'}
-                        if new_file_ext not in dangerous_types:
-                            new_file_path = block_dir / f"{base_name}.{new_file_ext}"
-                            if not new_file_path.exists():
-                                with open(new_file_path, 'wb') as f:
-                                    f.write(save_data)
-                                logger.info(f"   ✓ Created file: {new_file_path.name}")
-                                if decoded_binary is not None:
-                                    logger.info(f"   🔓 Decoded from data URI")
+                            updated_count += 1
                         else:
-                            logger.warning(f"   ⚠️  Skipping all file creation for executable: {new_file_ext} (security risk)")
-                            # Remove any existing .bin file if it was created before security fix
-                            bin_file = block_dir / f"{base_name}_raw.bin"
-                            if bin_file.exists():
-                                bin_file.unlink()
-                                logger.info(f"   ✓ Removed existing .bin file for security")
-                    
-                    updated_count += 1
-                else:
-                    unchanged_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error reinterpreting OP_RETURN {op_return.txid}: {e}")
-        
-        # Commit all changes
-        self.db.commit()
-        
+                            unchanged_count += 1
+                        
+                    except Exception as e:
+                        logger.error(f"Error reinterpreting OP_RETURN {op_return.txid}: {e}")
+                
+                # Wait for this chunk's files before committing so the database never gets ahead of the disk
+                for future, new_file_name, decoded in writes:
+                    try:
+                        if future.result() is not False and verbose:
+                            # Message only built when it's actually logged
+                            decoded_note = " (🔓 decoded from data URI)" if decoded else ""
+                            logger.debug(f"   ✓ Created file: {new_file_name}{decoded_note}")
+                    except Exception as e:
+                        logger.error(f"Error writing reinterpreted file: {e}")
+                for future in metadata_updates:
+                    try:
+                        if future.result() is False:
+                            skipped_writes += 1
+                    except Exception as e:
+                        logger.error(f"Error updating metadata file: {e}")
+                
+                # Update (one statement) and commit each chunk so the transaction stays small
+                if updates:
+                    sql, params = build_file_type_update(updates)
+                    self.db.execute(text(sql), params)
+                    self.db.commit()
+                
+                processed = updated_count + unchanged_count
+                logger.info(f"📈 Progress: {processed}/{total_count} OP_RETURNs ({updated_count} updated)")
+            
         logger.info("\n" + "=" * 80)
         logger.info(f"✅ Reinterpretation complete!")
         logger.info(f"   Updated: {updated_count}")
         logger.info(f"   Unchanged: {unchanged_count}")
+        logger.info(f"   Metadata files already up to date: {skipped_writes}")
         
         return updated_count
     
@@ -842,38 +1554,21 @@ class OPReturnScanner:
         try:
             logger.info(f"\n📊 Regenerating timeline_data.json...")
             
-            # Import generate_timeline_data functions
-            import sys
-            from pathlib import Path
+            if generate_timeline_data is None:
+                logger.debug(f"   generate_timeline_data.py not found next to {Path(__file__).name}")
+                return
             
-            # Try to import the generate_timeline_data module
             try:
-                # Check if generate_timeline_data.py exists in the same directory
-                script_dir = Path(__file__).parent
-                generate_script = script_dir / 'generate_timeline_data.py'
+                # Call the scan function (pass the op_return_data directory)
+                timeline_data = generate_timeline_data.scan_op_return_data(str(self.output_dir))
                 
-                if generate_script.exists():
-                    # Import the module dynamically
-                    import importlib.util
-                    spec = importlib.util.spec_from_file_location("generate_timeline_data", generate_script)
-                    generate_module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(generate_module)
+                if timeline_data:
+                    # Save to JSON file (in op_return_data directory)
+                    write_json_file(self.output_dir / 'timeline_data.json', timeline_data)
                     
-                    # Call the scan function (pass the op_return_data directory)
-                    timeline_data = generate_module.scan_op_return_data(str(self.output_dir))
-                    
-                    if timeline_data:
-                        # Save to JSON file (in op_return_data directory)
-                        output_file = self.output_dir / 'timeline_data.json'
-                        import json
-                        with open(output_file, 'w', newline='\n') as f:
-                            json.dump(timeline_data, f, indent=2)
-                        
-                        logger.info(f"   ✓ Updated timeline_data.json ({len(timeline_data)} items)")
-                    else:
-                        logger.debug("   No timeline data to generate")
+                    logger.info(f"   ✓ Updated timeline_data.json ({len(timeline_data)} items)")
                 else:
-                    logger.debug(f"   generate_timeline_data.py not found at {generate_script}")
+                    logger.debug("   No timeline data to generate")
             except Exception as e:
                 logger.warning(f"   ⚠️  Failed to regenerate timeline_data.json: {e}")
                 logger.debug(f"   You can manually run: python generate_timeline_data.py")
@@ -881,7 +1576,11 @@ class OPReturnScanner:
             logger.debug(f"Error regenerating timeline data: {e}")
     
     def setup_git_authentication(self):
-        """Setup git authentication using GitHub token or SSH"""
+        """Setup git authentication using GitHub token or SSH (once per scanner)"""
+        # The remote lookup and push environment don't change between syncs, so work them out once
+        if self.git_push_env is not None:
+            return True
+        
         if self.github_token:
             # Use HTTPS with token - update remote URL if needed
             try:
@@ -909,6 +1608,20 @@ class OPReturnScanner:
                         cwd=str(self.submodule_root)
                     )
                     logger.debug(f"   Updated remote URL to HTTPS")
+                    current_url = https_url
+                
+                self.git_remote_url = current_url
+                self.git_push_env = {}
+                if 'github.com' in current_url:
+                    # Send the token as an auth header instead of swapping it into the remote URL and back
+                    # (passed through the environment so it isn't on the command line either)
+                    credentials = base64.b64encode(f"x-access-token:{self.github_token}".encode()).decode()
+                    self.git_push_env = {
+                        'GIT_TERMINAL_PROMPT': '0',
+                        'GIT_CONFIG_COUNT': '1',
+                        'GIT_CONFIG_KEY_0': 'http.https://github.com/.extraheader',
+                        'GIT_CONFIG_VALUE_0': f"Authorization: Basic {credentials}",
+                    }
                 
                 return True
             except Exception as e:
@@ -917,6 +1630,10 @@ class OPReturnScanner:
         else:
             # Fall back to SSH if no token provided
             logger.debug("No GITHUB_TOKEN found, using SSH authentication")
+            self.git_push_env = {}
+            ssh_key = os.getenv('SSH_KEY_PATH', os.path.expanduser('~/.ssh/cyber64'))
+            if os.path.exists(ssh_key):
+                self.git_push_env['GIT_SSH_COMMAND'] = f'ssh -i {ssh_key} -o IdentitiesOnly=yes'
             return True
     
     def sync_git_changes(self):
@@ -936,154 +1653,100 @@ class OPReturnScanner:
         # Log that we're checking for sync
         logger.info(f"\n🔄 Checking for git changes in {self.submodule_root.name}...")
         
+        # Run git in the submodule via cwd= rather than os.chdir (which is process-wide),
+        # with stdin closed so git can never stop to prompt for credentials
+        repo_dir = str(self.submodule_root)
+        
         try:
-            # Change to submodule directory
-            original_cwd = os.getcwd()
-            os.chdir(str(self.submodule_root))
+            # Check if there are any changes
+            result = subprocess.run(
+                ['git', 'status', '--porcelain'],
+                capture_output=True,
+                text=True,
+                check=False,
+                cwd=repo_dir,
+                stdin=subprocess.DEVNULL
+            )
+            
+            # Split the status output once and reuse it for the preview and the commit message
+            status_lines = result.stdout.splitlines()
+            if not status_lines:
+                logger.info(f"   ✓ No changes to commit - repository is up to date")
+                return
+            
+            # Show what will be committed
+            logger.info(f"   Changes detected:")
+            for line in status_lines[:10]:  # Show first 10 files
+                logger.info(f"     {line}")
+            if len(status_lines) > 10:
+                logger.info(f"     ... and {len(status_lines) - 10} more files")
+            
+            # Add all changes
+            subprocess.run(
+                ['git', 'add', '-A'],
+                check=True,
+                capture_output=True,
+                cwd=repo_dir,
+                stdin=subprocess.DEVNULL
+            )
+            
+            # Get count of new/changed files for commit message
+            new_files = sum(1 for line in status_lines if line.startswith('??'))
+            modified_files = len(status_lines) - new_files
+            
+            # Create commit message
+            commit_msg = f"Add OP_RETURN data: {new_files} new files"
+            if modified_files > 0:
+                commit_msg += f", {modified_files} modified"
+            
+            # Commit
+            subprocess.run(
+                ['git', 'commit', '-m', commit_msg],
+                check=True,
+                capture_output=True,
+                cwd=repo_dir,
+                stdin=subprocess.DEVNULL
+            )
+            logger.info(f"   ✓ Committed changes")
+            
+            # Push to remote (auth environment was prepared once by setup_git_authentication)
+            push_env = os.environ.copy()
+            push_env.update(self.git_push_env or {})
+            push_result = subprocess.run(
+                ['git', 'push'],
+                check=False,
+                capture_output=True,
+                text=True,
+                env=push_env,
+                cwd=repo_dir,
+                stdin=subprocess.DEVNULL
+            )
+            
+            # Check if token might be invalid
+            if self.github_token and 'github.com' in (self.git_remote_url or '') and push_result.returncode != 0:
+                error_output = push_result.stderr if push_result.stderr else push_result.stdout
+                if '403' in error_output or 'Permission denied' in error_output or 'denied' in error_output.lower():
+                    logger.warning(f"   ⚠️  Authentication failed - check your GITHUB_TOKEN:")
+                    logger.warning(f"      - Token must have 'repo' scope")
+                    logger.warning(f"      - Token must be valid and not expired")
+                    logger.warning(f"      - Set GITHUB_TOKEN in .env file")
+            
+            if push_result.returncode == 0:
+                logger.info(f"   ✓ Pushed to remote")
+                logger.info(f"   ✅ Git sync complete!")
+            else:
+                error_msg = push_result.stderr if push_result.stderr else push_result.stdout
+                logger.warning(f"   ⚠️  Git push failed: {error_msg}")
+                if not self.github_token:
+                    logger.warning(f"   Set GITHUB_TOKEN in .env file for automatic authentication")
+                    logger.warning(f"   Or manually run: eval $(ssh-agent) && ssh-add ~/.ssh/cyber64")
+                elif '403' in error_msg or 'Permission denied' in error_msg or 'denied' in error_msg.lower():
+                    logger.warning(f"   Authentication issue detected:")
+                    logger.warning(f"   - Verify GITHUB_TOKEN has 'repo' scope")
+                    logger.warning(f"   - Check token hasn't expired")
+                    logger.warning(f"   - Ensure token has access to bitcoin_large_op_returns repository")
+                logger.warning(f"   Manual push: cd {self.submodule_root} && git push")
             
-            try:
-                # Check if there are any changes
-                result = subprocess.run(
-                    ['git', 'status', '--porcelain'],
-                    capture_output=True,
-                    text=True,
-                    check=False
-                )
-                
-                if not result.stdout.strip():
-                    logger.info(f"   ✓ No changes to commit - repository is up to date")
-                    return
-                
-                # Show what will be committed
-                logger.info(f"   Changes detected:")
-                for line in result.stdout.strip().split('\n')[:10]:  # Show first 10 files
-                    logger.info(f"     {line}")
-                if result.stdout.count('\n') > 10:
-                    logger.info(f"     ... and {result.stdout.count('\n') - 10} more files")
-                
-                # Add all changes
-                subprocess.run(
-                    ['git', 'add', '-A'],
-                    check=True,
-                    capture_output=True
-                )
-                
-                # Get count of new/changed files for commit message
-                status_lines = result.stdout.strip().split('\n')
-                new_files = sum(1 for line in status_lines if line.startswith('??'))
-                modified_files = len(status_lines) - new_files
-                
-                # Create commit message
-                commit_msg = f"Add OP_RETURN data: {new_files} new files"
-                if modified_files > 0:
-                    commit_msg += f", {modified_files} modified"
-                
-                # Commit
-                subprocess.run(
-                    ['git', 'commit', '-m', commit_msg],
-                    check=True,
-                    capture_output=True
-                )
-                logger.info(f"   ✓ Committed changes")
-                
-                # Push to remote (use token if available)
-                push_env = os.environ.copy()
-                
-                if self.github_token:
-                    # Use HTTPS with token - embed token in URL for this push
-                    result = subprocess.run(
-                        ['git', 'remote', 'get-url', 'origin'],
-                        capture_output=True,
-                        text=True,
-                        check=True
-                    )
-                    remote_url = result.stdout.strip()
-                    
-                    # Extract repo path from URL
-                    if 'github.com' in remote_url:
-                        if remote_url.startswith('https://'):
-                            # Already HTTPS, add token
-                            if '@' not in remote_url:  # No token already embedded
-                                repo_path = remote_url.replace('https://github.com/', '').replace('.git', '')
-                                token_url = f'https://{self.github_token}@github.com/{repo_path}.git'
-                            else:
-                                token_url = remote_url
-                        else:
-                            # SSH URL, convert to HTTPS with token
-                            repo_path = remote_url.replace('git@github.com:', '').replace('.git', '')
-                            token_url = f'https://{self.github_token}@github.com/{repo_path}.git'
-                        
-                        # Temporarily update remote URL with token, then push
-                        subprocess.run(
-                            ['git', 'remote', 'set-url', 'origin', token_url],
-                            check=True
-                        )
-                        push_result = subprocess.run(
-                            ['git', 'push'],
-                            check=False,
-                            capture_output=True,
-                            text=True,
-                            env=push_env
-                        )
-                        # Restore original URL (without token) for security
-                        clean_url = remote_url.replace(f'{self.github_token}@', '') if '@' in remote_url else remote_url
-                        if not clean_url.startswith('https://'):
-                            clean_url = f'https://github.com/{repo_path}.git'
-                        subprocess.run(
-                            ['git', 'remote', 'set-url', 'origin', clean_url],
-                            check=False
-                        )
-                        
-                        # Check if token might be invalid
-                        if push_result.returncode != 0:
-                            error_output = push_result.stderr if push_result.stderr else push_result.stdout
-                            if '403' in error_output or 'Permission denied' in error_output or 'denied' in error_output.lower():
-                                logger.warning(f"   ⚠️  Authentication failed - check your GITHUB_TOKEN:")
-                                logger.warning(f"      - Token must have 'repo' scope")
-                                logger.warning(f"      - Token must be valid and not expired")
-                                logger.warning(f"      - Set GITHUB_TOKEN in .env file")
-                    else:
-                        # Not GitHub, use regular push
-                        push_result = subprocess.run(
-                            ['git', 'push'],
-                            check=False,
-                            capture_output=True,
-                            text=True,
-                            env=push_env
-                        )
-                else:
-                    # No token, try SSH
-                    ssh_key = os.getenv('SSH_KEY_PATH', os.path.expanduser('~/.ssh/cyber64'))
-                    if os.path.exists(ssh_key):
-                        push_env['GIT_SSH_COMMAND'] = f'ssh -i {ssh_key} -o IdentitiesOnly=yes'
-                    
-                    push_result = subprocess.run(
-                        ['git', 'push'],
-                        check=False,
-                        capture_output=True,
-                        text=True,
-                        env=push_env
-                    )
-                
-                if push_result.returncode == 0:
-                    logger.info(f"   ✓ Pushed to remote")
-                    logger.info(f"   ✅ Git sync complete!")
-                else:
-                    error_msg = push_result.stderr if push_result.stderr else push_result.stdout
-                    logger.warning(f"   ⚠️  Git push failed: {error_msg}")
-                    if not self.github_token:
-                        logger.warning(f"   Set GITHUB_TOKEN in .env file for automatic authentication")
-                        logger.warning(f"   Or manually run: eval $(ssh-agent) && ssh-add ~/.ssh/cyber64")
-                    elif '403' in error_msg or 'Permission denied' in error_msg or 'denied' in error_msg.lower():
-                        logger.warning(f"   Authentication issue detected:")
-                        logger.warning(f"   - Verify GITHUB_TOKEN has 'repo' scope")
-                        logger.warning(f"   - Check token hasn't expired")
-                        logger.warning(f"   - Ensure token has access to bitcoin_large_op_returns repository")
-                    logger.warning(f"   Manual push: cd {self.submodule_root} && git push")
-                
-            finally:
-                os.chdir(original_cwd)
-                
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr.decode() if e.stderr else str(e)
             logger.warning(f"   ⚠️  Git sync failed: {error_msg}")
@@ -1119,6 +1782,8 @@ Examples:
   Reinterpret file types (update 'binary' files with new detection):
     python op_return_scanner.py --reinterpret
     python op_return_scanner.py --reinterpret text
+    python op_return_scanner.py --reinterpret --jobs 8
+    python op_return_scanner.py --reinterpret --jobs 0    (one worker per CPU core)
   
   Re-scan all blocks with large OP_RETURNs (to add fee tracking, etc.):
     python op_return_scanner.py --rescan_large_op_returns
@@ -1138,6 +1803,8 @@ Examples:
                        help='Show statistics and exit')
     parser.add_argument('--reinterpret', '-r', nargs='?', const='binary', default=None, metavar='TYPE',
                        help='Reinterpret existing OP_RETURNs with specified file type (default: binary)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Worker processes detecting file types when reinterpreting (default: 1, 0 = one per CPU core)')
     parser.add_argument('--rescan_large_op_returns', action='store_true',
                        help='Re-scan all blocks that have large OP_RETURNs (to update with new features like fee tracking)')
     parser.add_argument('--no-db', action='store_true', 
@@ -1148,43 +1815,47 @@ Examples:
                        help='Disable automatic git sync (overrides environment variable)')
     parser.add_argument('--regenerate-timeline-data-json', action='store_true',
                        help='Regenerate timeline_data.json from existing OP_RETURN data and exit')
+    parser.add_argument('--batch-size', type=int, default=10,
+                       help='Number of blocks to fetch per batched RPC request (default: 10)')
+    parser.add_argument('--fetch-workers', type=int, default=2,
+                       help='Number of block batches to prefetch in background threads (default: 2)')
     
     args = parser.parse_args()
     
+    # Stats, reinterpretation and re-scanning only work against the database
+    if args.no_db and (args.stats or args.reinterpret is not None or args.rescan_large_op_returns):
+        logger.error("Stats, reinterpretation and re-scanning require database mode (don't use --no-db)")
+        return 0
+    
+    # Only scanning and re-scanning talk to Bitcoin Core - skip the RPC connection otherwise
+    use_rpc = not (args.stats or args.reinterpret is not None or args.regenerate_timeline_data_json)
+    
     try:
         auto_sync = args.auto_sync_git if args.auto_sync_git else (False if args.no_auto_sync_git else None)
-        scanner = OPReturnScanner(output_dir=args.output, use_database=not args.no_db, auto_sync_git=auto_sync)
+        scanner = OPReturnScanner(output_dir=args.output, use_database=not args.no_db, auto_sync_git=auto_sync,
+                                  batch_size=args.batch_size, fetch_workers=args.fetch_workers, use_rpc=use_rpc)
         
         # Show stats and exit
         if args.stats:
-            if not args.no_db:
-                stats = scanner.get_scan_statistics()
-                print("\n📊 OP_RETURN Scan Statistics")
-                print("=" * 50)
-                print(f"Total blocks scanned:     {stats['total_blocks_scanned']}")
-                print(f"Total large OP_RETURNs:   {stats['total_large_op_returns']}")
-                if stats['first_block']:
-                    print(f"Block range:              {stats['first_block']} - {stats['last_block']}")
-                print(f"Average per block:        {stats['avg_per_block']:.2f}")
-                print()
-            else:
-                logger.error("Stats require database mode (don't use --no-db)")
+            stats = scanner.get_scan_statistics()
+            print("\n📊 OP_RETURN Scan Statistics")
+            print("=" * 50)
+            print(f"Total blocks scanned:     {stats['total_blocks_scanned']}")
+            print(f"Total large OP_RETURNs:   {stats['total_large_op_returns']}")
+            if stats['first_block']:
+                print(f"Block range:              {stats['first_block']} - {stats['last_block']}")
+            print(f"Average per block:        {stats['avg_per_block']:.2f}")
+            print()
             return 0
         
         # Reinterpret file types and exit
         if args.reinterpret is not None:
-            if not args.no_db:
-                scanner.reinterpret_file_types(args.reinterpret)
-            else:
-                logger.error("Reinterpretation requires database mode (don't use --no-db)")
+            scanner.reinterpret_file_types(args.reinterpret, jobs=args.jobs)
             return 0
         
         # Re-scan all blocks with large OP_RETURNs and exit
         if args.rescan_large_op_returns:
-            if not args.no_db:
-                scanner.rescan_large_op_returns()
-            else:
-                logger.error("Re-scanning requires database mode (don't use --no-db)")
+            scanner.rescan_large_op_returns()
             return 0
         
         # Regenerate timeline_data.json and exit
@@ -10,6 +10,7 @@ from collections import defaultdict
 from db_config import SessionLocal
 from models import OPReturnScan, LargeOPReturn
 from sqlalchemy import func, desc
+from sqlalchemy.orm import selectinload, defer
 
 def show_statistics():
     """Show overall statistics"""
@@ -225,7 +226,10 @@ def search_by_txid(txid):
     """Search for OP_RETURN by transaction ID"""
     db = SessionLocal()
     
-    ops = db.query(LargeOPReturn).filter(LargeOPReturn.txid.like(f"%{txid}%")).all()
+    # The payload bytes aren't shown - don't load them
+    ops = db.query(LargeOPReturn).options(defer(LargeOPReturn.raw_bytes)).filter(
+        LargeOPReturn.txid.like(f"%{txid}%")
+    ).all()
     
     if not ops:
         print(f"[NOTFOUND] No OP_RETURNs found matching txid: {txid}")
@@ -410,8 +414,10 @@ def generate_dashboard(output_file='op_return_dashboard.html'):
                 size_counts[label] += 1
                 break
     
-    # Get monthly activity data
-    scans_with_ops = db.query(OPReturnScan).filter(
+    # Get monthly activity data - file types for all scans come in one extra query (not one per scan)
+    scans_with_ops = db.query(OPReturnScan).options(
+        selectinload(OPReturnScan.op_returns).load_only(LargeOPReturn.file_type)
+    ).filter(
         OPReturnScan.large_op_returns_found > 0
     ).order_by(OPReturnScan.block_time).all()
     
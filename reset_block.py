@@ -1,32 +1,41 @@
-"""Reset a block to allow re-scanning"""
+"""Reset one or more blocks to allow re-scanning"""
 import sys
 from db_config import SessionLocal
 from models import OPReturnScan, LargeOPReturn
 
 if len(sys.argv) < 2:
-    print("Usage: python reset_block.py <block_number>")
+    print("Usage: python reset_block.py <block_number> [<block_number> ...]")
     sys.exit(1)
 
-block_number = int(sys.argv[1])
+block_numbers = [int(arg) for arg in sys.argv[1:]]
 db = SessionLocal()
 
 try:
-    scan = db.query(OPReturnScan).filter_by(block_number=block_number).first()
-    if scan:
-        # First delete the associated large_op_returns records
-        op_returns_count = db.query(LargeOPReturn).filter_by(scan_id=scan.id).count()
-        db.query(LargeOPReturn).filter_by(scan_id=scan.id).delete()
+    # Look up all the scans at once, then delete with two bulk statements and a single commit
+    scans = db.query(OPReturnScan.id, OPReturnScan.block_number).filter(
+        OPReturnScan.block_number.in_(block_numbers)
+    ).all()
+    scan_ids = [scan.id for scan in scans]
+    
+    if scan_ids:
+        # First delete the associated large_op_returns records (delete returns the row count)
+        op_returns_count = db.query(LargeOPReturn).filter(
+            LargeOPReturn.scan_id.in_(scan_ids)
+        ).delete(synchronize_session=False)
         
-        # Then delete the scan record
-        db.delete(scan)
+        # Then delete the scan records
+        db.query(OPReturnScan).filter(OPReturnScan.id.in_(scan_ids)).delete(synchronize_session=False)
         db.commit()
-        print(f"[OK] Block {block_number} deleted from database ({op_returns_count} OP_RETURNs removed), ready to re-scan")
-    else:
-        print(f"[INFO] Block {block_number} not in database")
+        
+        deleted_blocks = sorted(scan.block_number for scan in scans)
+        print(f"[OK] Block(s) {', '.join(map(str, deleted_blocks))} deleted from database ({op_returns_count} OP_RETURNs removed), ready to re-scan")
+    
+    missing_blocks = sorted(set(block_numbers) - {scan.block_number for scan in scans})
+    if missing_blocks:
+        print(f"[INFO] Block(s) {', '.join(map(str, missing_blocks))} not in database")
 except Exception as e:
     db.rollback()
-    print(f"[ERROR] Failed to delete block {block_number}: {e}")
+    print(f"[ERROR] Failed to delete block(s) {', '.join(map(str, block_numbers))}: {e}")
     sys.exit(1)
 finally:
     db.close()
-